@@ -0,0 +1,71 @@
+"""Guard the cold start of the CLI: its import time and its imported modules.
+
+Imports the CLI in fresh interpreters with `python -X importtime`, fails if
+the GUI toolkit or the dependencies of the commands are imported, and reports the median cumulative import time
+against a budget in milliseconds. The exit status is 1 if a check fails, so
+the script can run in CI.
+
+Run from the root of the repository:
+
+    python -m benchmarks.cli_importtime [budget in ms] [number of runs]
+"""
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULE = "canvas_info_cli"
+FORBIDDEN = ("PySimpleGUI", "tkinter", "_tkinter")
+# Only imported once a command runs in the CLI process instead of the agent.
+COMMAND_DEPENDENCIES = ("canvasapi", "requests", "xlsxwriter")
+
+
+def import_times(module: str) -> dict:
+    """Import module in a fresh interpreter, return the cumulative time of each module in µs."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 150.0
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    samples = []
+    for _ in range(runs):
+        times = import_times(MODULE)
+        gui = sorted(name for name in times if name.split(".")[0] in FORBIDDEN)
+        if gui:
+            print(f"{MODULE} imports the GUI toolkit: {', '.join(gui)}")
+            sys.exit(1)
+        commands = sorted(
+            name for name in times if name.split(".")[0] in COMMAND_DEPENDENCIES
+        )
+        if commands:
+            print(f"{MODULE} imports the commands: {', '.join(commands)}")
+            sys.exit(1)
+        samples.append(times[MODULE] / 1000)
+
+    slowest = sorted(
+        (name for name in times if "." not in name and name != MODULE),
+        key=times.get,
+        reverse=True,
+    )[:5]
+    median = statistics.median(samples)
+    print(f"{MODULE}: {median:.0f} ms median of {runs} runs, budget {budget:.0f} ms")
+    for name in slowest:
+        print(f"  {name:24} {times[name] / 1000:6.0f} ms")
+    sys.exit(0 if median <= budget else 1)
@@ -0,0 +1,59 @@
+"""Measure the throughput and peak memory of the Excel writers.
+
+Run from the root of the repository:
+
+    python -m benchmarks.excel_throughput [number of rows]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from repobee_canvas.records import GroupRef, Row
+from repobee_canvas.writers import ExcelWriter, TeammatesWriter, write_rows
+
+GROUP_SIZE = 4
+
+
+def rows(n: int):
+    groups = [
+        GroupRef(10_000 + i, str(100 + i), GROUP_SIZE, GROUP_SIZE)
+        for i in range(n // GROUP_SIZE + 1)
+    ]
+    for i in range(n):
+        yield Row(
+            groups[i // GROUP_SIZE],
+            f"student{i}",
+            f"Student {i}",
+            1_000_000 + i,
+            2_000_000 + i,
+            f"s.student{i}@student.tue.nl",
+            i,
+        )
+
+
+def measure(writer_class, n: int, directory: Path):
+    path = directory / f"{writer_class.__name__}.xlsx"
+    start = time.perf_counter()
+    write_rows(rows(n), [writer_class(path)])
+    duration = time.perf_counter() - start
+
+    # Tracing slows down the writer, so the memory is measured separately.
+    tracemalloc.start()
+    write_rows(rows(n), [writer_class(path)])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{writer_class.__name__:16} {n / duration:9.0f} rows/s "
+        f"{peak / 2**20:6.1f} MiB peak {path.stat().st_size / 2**20:6.1f} MiB file"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"{n} rows")
+    with tempfile.TemporaryDirectory() as directory:
+        for writer_class in (ExcelWriter, TeammatesWriter):
+            measure(writer_class, n, Path(directory))
@@ -0,0 +1,81 @@
+"""Measure the startup of the GUI, from importing it to showing its window.
+
+Each run starts a fresh interpreter with the settings in a temporary folder
+and times three steps: importing repobee_canvas.gui, reading the settings
+(set_default_entries) and making the window. The window is only made when a
+display is available.
+
+Run from the root of the repository:
+
+    python -m benchmarks.gui_startup [number of runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+RUN = """
+import json, sys, time
+start = time.perf_counter()
+import PySimpleGUI as sg
+sg.set_options(user_settings_path=sys.argv[1])
+toolkit = time.perf_counter()
+from repobee_canvas import gui
+imported = time.perf_counter()
+gui.set_default_entries()
+settings = time.perf_counter()
+times = {
+    "PySimpleGUI": toolkit - start,
+    "import gui": imported - toolkit,
+    "settings": settings - imported,
+}
+if sys.argv[2] == "1":
+    window = gui.make_window()
+    shown = time.perf_counter()
+    gui.attach_tooltips(window)
+    times["window"] = shown - settings
+    times["tooltips"] = time.perf_counter() - shown
+    window.close()
+print(json.dumps(times))
+"""
+
+
+def has_display() -> bool:
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+def run(folder: Path, window: bool) -> dict:
+    # PySimpleGUI names the settings file after the script, as for the GUI.
+    script = folder / "canvas_info_gui.py"
+    script.write_text(RUN, "utf-8")
+    result = subprocess.run(
+        [sys.executable, str(script), str(folder), "1" if window else "0"],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    window = has_display()
+    if not window:
+        print("No display: the window is not made.")
+
+    samples = []
+    with tempfile.TemporaryDirectory() as folder:
+        for _ in range(runs):
+            samples.append(run(Path(folder), window))
+
+    for step in samples[0]:
+        median = statistics.median(sample[step] for sample in samples)
+        print(f"{step:12} {median * 1000:7.1f} ms")
@@ -0,0 +1,105 @@
+"""Compare the memory used by the rows of a Canvas-Git map table as dicts
+referencing canvasapi groups with the memory used by compact rows.
+
+Run from the root of the repository:
+
+    python -m benchmarks.table_memory [number of students]
+"""
+
+import copy
+import sys
+import tracemalloc
+
+from canvasapi import Canvas
+from canvasapi.group import Group
+
+from repobee_canvas.columns import EMAIL, FULL_NAME, GIT_ID, GROUP, ID, NAME
+from repobee_canvas.records import Row, group_ref
+
+GROUP_SIZE = 4
+
+
+def canvas_groups(n: int) -> list:
+    """Create n canvasapi groups as listed by Canvas.
+
+    Parsing the attributes of a group is slow, so each group is a copy of a
+    parsed template with its own ID and name.
+    """
+    requester = Canvas("https://canvas.example.com", "token")._Canvas__requester
+    template = Group(
+        requester,
+        {
+            "id": 10_000,
+            "name": "100",
+            "members_count": GROUP_SIZE,
+            "max_membership": GROUP_SIZE,
+            "description": None,
+            "is_public": False,
+            "join_level": "invitation_only",
+            "context_type": "Course",
+            "course_id": 34,
+            "group_category_id": 7,
+            "created_at": "2021-09-01T12:00:00Z",
+            "storage_quota_mb": 50,
+            "permissions": {"create_discussion_topic": True},
+        },
+    )
+    groups = []
+    for i in range(n):
+        group = copy.copy(template)
+        group.id = 10_000 + i
+        group.name = str(100 + i)
+        groups.append(group)
+    return groups
+
+
+def values(i: int) -> tuple:
+    return (
+        f"student{i}",
+        f"Student {i}",
+        1_000_000 + i,
+        2_000_000 + i,
+        f"s.student{i}@student.tue.nl",
+    )
+
+
+def dict_rows(n: int) -> list:
+    groups = canvas_groups(n // GROUP_SIZE + 1)
+    rows = []
+    for i in range(n):
+        name, full_name, login_id, git_id, email = values(i)
+        rows.append(
+            {
+                GROUP: groups[i // GROUP_SIZE],
+                NAME: name,
+                FULL_NAME: full_name,
+                ID: login_id,
+                GIT_ID: git_id,
+                EMAIL: email,
+            }
+        )
+    return rows
+
+
+def compact_rows(n: int) -> list:
+    groups = [group_ref(group) for group in canvas_groups(n // GROUP_SIZE + 1)]
+    return [Row(groups[i // GROUP_SIZE], *values(i), user_id=i) for i in range(n)]
+
+
+def measure(build, n: int) -> int:
+    tracemalloc.start()
+    rows = build(n)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return size
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    before = measure(dict_rows, n)
+    after = measure(compact_rows, n)
+    print(f"{n} students")
+    print(f"dict rows and canvasapi groups: {before / 2**20:6.1f} MiB")
+    print(f"Row and GroupRef:               {after / 2**20:6.1f} MiB")
+    print(f"saved {100 * (1 - after / before):.0f}%")
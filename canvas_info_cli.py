@@ -5,15 +5,18 @@ from argparse import (
     BooleanOptionalAction,
     RawDescriptionHelpFormatter,
 )
-from math import fabs
-from tkinter.font import names
-
-import PySimpleGUI as sg
 
 from repobee_canvas import common
-from repobee_canvas.command.create_students_files import CreateStudentsFiles
-from repobee_canvas.command.verify_course_id import VerifyCourseByID
-from repobee_canvas.gui import (
+from repobee_canvas.agent import UNIX_SOCKETS, AgentUnavailable, forward
+from repobee_canvas.defaults import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_HOST,
+    DEFAULT_INTERVAL,
+    DEFAULT_PORT,
+    DEFAULT_SNAPSHOT_DB,
+)
+from repobee_canvas.progress import ProgressLine, ProgressStream
+from repobee_canvas.keys import (
     KEY_ACCESS_TOKEN,
     KEY_BASE_URL,
     KEY_COURSE_ID,
@@ -29,10 +32,14 @@ from repobee_canvas.gui import (
     KEY_STU_FILE,
     KEY_XLSX_INFO_FILE,
 )
+from repobee_canvas.settings import read_settings
 from repobee_canvas.tiphelp import Help
 
 KEY_INFO = "info"
 KEY_VERIFY = "verify"
+KEY_WATCH = "watch"
+KEY_SERVE = "serve"
+KEY_AGENT = "agent"
 
 help = Help()
 
@@ -54,6 +61,40 @@ def get_boolean_argument(arg):
     raise InvalidArgument("The given option argument is not a valid boolean.")
 
 
+def run_command(action: str, kwargs: dict, use_agent: bool = True):
+    """Run the command of action, in the agent if it is running.
+
+    The commands are only imported when they run in this process, so a
+    forwarded command does not load canvasapi and the other dependencies.
+    """
+    if use_agent:
+        try:
+            return forward(action, kwargs)
+        except AgentUnavailable:
+            pass
+
+    if action == KEY_VERIFY:
+        from repobee_canvas.command.verify_course_id import VerifyCourseByID
+
+        VerifyCourseByID(**kwargs)
+    else:
+        from repobee_canvas.command.create_students_files import (
+            CreateStudentsFiles,
+        )
+
+        CreateStudentsFiles(**kwargs)
+
+
+def start_progress_line() -> ProgressLine:
+    """Show the progress of the commands run in this process on stderr."""
+    stream = ProgressStream()
+    common.on_progress(stream.report)
+    line = ProgressLine(stream)
+    common.redirect(line.message)
+    line.start()
+    return line
+
+
 def main():
     base_url = None
     access_token = None
@@ -65,6 +106,7 @@ def main():
     include_group = False
     include_member = False
     include_initials = False
+    progress_line = None
 
     try:
         parser = ArgumentParser(
@@ -128,28 +170,126 @@ def main():
             "--yaml_file",
             help=help.yaml_file,
         )
+        parser.add_argument(
+            "-c",
+            "--concurrency",
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help=help.concurrency,
+        )
+        parser.add_argument(
+            "--bulk",
+            action=BooleanOptionalAction,
+            default=True,
+            help=help.bulk,
+        )
+        parser.add_argument(
+            "--active_only",
+            action=BooleanOptionalAction,
+            default=False,
+            help=help.active_only,
+        )
+        parser.add_argument(
+            "--cache-dir",
+            help=help.cache_dir,
+        )
+        parser.add_argument(
+            "--cache-ttl",
+            type=int,
+            help=help.cache_ttl,
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help=help.no_cache,
+        )
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help=help.snapshot,
+        )
+        parser.add_argument(
+            "--snapshot-db",
+            help=help.snapshot_db,
+        )
+        parser.add_argument(
+            "--from-snapshot",
+            action="store_true",
+            help=help.from_snapshot,
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help=help.full,
+        )
+        parser.add_argument(
+            "--diff-report",
+            help=help.diff_report,
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=DEFAULT_INTERVAL,
+            help=help.interval,
+        )
+        parser.add_argument(
+            "--host",
+            default=DEFAULT_HOST,
+            help=help.host,
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=DEFAULT_PORT,
+            help=help.port,
+        )
+        parser.add_argument(
+            "--socket",
+            help=help.socket,
+        )
+        parser.add_argument(
+            "--no-agent",
+            action="store_true",
+            help=help.no_agent,
+        )
+        parser.add_argument(
+            "--progress",
+            action="store_true",
+            help=help.progress,
+        )
         parser.add_argument(
             "action",
-            choices=[KEY_INFO, KEY_VERIFY],
+            choices=[KEY_INFO, KEY_VERIFY, KEY_WATCH, KEY_SERVE, KEY_AGENT],
             help=help.action,
         )
 
         namespace = parser.parse_args()
 
+        if namespace.action == KEY_AGENT:
+            from repobee_canvas.command.run_agent import RunAgent
+
+            RunAgent()
+            return
+
+        if namespace.progress:
+            progress_line = start_progress_line()
+
         course = None
-        settings = sg.UserSettings("canvas_info.json")
-        courses = settings[KEY_COURSES]
+        settings = read_settings()
+        courses = settings.get(KEY_COURSES)
 
         course_id = namespace.course_id
-        if not course_id:
-            course_id = settings[KEY_COURSE_ID]
+        # Serving a given info file does not need the settings of a course.
+        serve_file = namespace.action == KEY_SERVE and namespace.info_file
+        if not course_id and not serve_file:
+            course_id = settings.get(KEY_COURSE_ID)
             if not course_id:
                 raise InvalidArgument("Invalid course ID. Please finish the settings")
 
-        if courses:
+        if courses and course_id:
             for c in courses:
                 if c[4:].startswith(course_id):
-                    course = settings[course_id]
+                    course = settings.get(course_id)
 
         base_url = namespace.base_url
         access_token = namespace.access_token
@@ -160,16 +300,58 @@ def main():
             if not access_token:
                 access_token = course[KEY_ACCESS_TOKEN]
 
-        if not base_url:
+        # Files created from a snapshot do not need access to Canvas.
+        needs_canvas = not (
+            (namespace.action == KEY_INFO and namespace.from_snapshot)
+            or namespace.action == KEY_SERVE
+        )
+
+        if needs_canvas and not base_url:
             raise InvalidArgument("Invalid base url. Please finish the settings")
 
-        if not access_token:
+        if needs_canvas and not access_token:
             raise InvalidArgument("Invalid access token. Please finish the settings")
 
+        cache_dir = None if namespace.no_cache else namespace.cache_dir
+        snapshot_db = namespace.snapshot_db
+        if namespace.snapshot and not snapshot_db:
+            snapshot_db = str(DEFAULT_SNAPSHOT_DB)
+
         if namespace.action == KEY_VERIFY:
             # course_name, group_set =
-            VerifyCourseByID(base_url, access_token, int(course_id))
-        elif namespace.action == KEY_INFO:
+            run_command(
+                KEY_VERIFY,
+                dict(
+                    canvas_base_url=base_url,
+                    canvas_access_token=access_token,
+                    canvas_course_id=int(course_id),
+                    cache_dir=cache_dir,
+                    cache_ttl=namespace.cache_ttl,
+                ),
+                not namespace.no_agent,
+            )
+        elif namespace.action == KEY_SERVE:
+            if namespace.info_file:
+                stu_csv_info_file = namespace.info_file + ".csv"
+            elif course:
+                stu_csv_info_file = course[KEY_CSV_INFO_FILE]
+            if not stu_csv_info_file:
+                raise InvalidArgument("No info file to serve. Please give --info_file")
+            if namespace.socket and not UNIX_SOCKETS:
+                raise InvalidArgument(
+                    "--socket needs Unix sockets, which this platform does not "
+                    "have. Please use --host and --port instead"
+                )
+
+            from repobee_canvas.command.serve_roster import ServeRoster
+
+            ServeRoster(
+                stu_csv_info_file,
+                host=namespace.host,
+                port=namespace.port,
+                socket_path=namespace.socket,
+            )
+        elif namespace.action in (KEY_INFO, KEY_WATCH):
             if namespace.info_file:
                 stu_csv_info_file = namespace.info_file + ".csv"
                 stu_xlsx_info_file = namespace.info_file + ".xlsx"
@@ -179,8 +361,8 @@ def main():
 
             include_group = namespace.inc_group
             include_member = namespace.inc_member
-            include_initials = namespace.inc_initials
-            only_full_groups = namespace.only_full_groups
+            include_initials = namespace.inc_initial
+            only_full_groups = namespace.full_groups
             member_option = namespace.option
 
             if course:
@@ -211,19 +393,49 @@ def main():
             if not member_option:
                 member_option = KEY_EMAIL
 
-            CreateStudentsFiles(
-                base_url,
-                access_token,
-                int(course_id),
-                stu_csv_info_file,
-                stu_xlsx_info_file,
-                students_yaml_file,
-                member_option,
-                include_group,
-                include_member,
-                include_initials,
-                only_full_groups,
+            files = dict(
+                student_member_option=member_option,
+                include_group=include_group,
+                include_member=include_member,
+                include_initials=include_initials,
+                only_full_groups=only_full_groups,
+                concurrency=namespace.concurrency,
+                bulk=namespace.bulk,
+                active_only=namespace.active_only,
+                cache_dir=cache_dir,
+                snapshot_db=snapshot_db,
+                diff_report=namespace.diff_report,
             )
+            if namespace.action == KEY_WATCH:
+                from repobee_canvas.command.watch_course import WatchCourse
+
+                WatchCourse(
+                    base_url,
+                    access_token,
+                    int(course_id),
+                    stu_csv_info_file,
+                    stu_xlsx_info_file,
+                    students_yaml_file,
+                    interval=namespace.interval,
+                    **files,
+                )
+            else:
+                run_command(
+                    KEY_INFO,
+                    dict(
+                        canvas_base_url=base_url,
+                        canvas_access_token=access_token,
+                        canvas_course_id=int(course_id),
+                        student_csv_info_file=stu_csv_info_file,
+                        student_xlsx_info_file=stu_xlsx_info_file,
+                        students_yaml_file=students_yaml_file,
+                        cache_ttl=namespace.cache_ttl,
+                        full=namespace.full,
+                        from_snapshot=namespace.from_snapshot,
+                        **files,
+                    ),
+                    not namespace.no_agent,
+                )
             common.inform("Done")
         else:
             common.fault("Invalid action.")
@@ -240,6 +452,10 @@ def main():
     else:
         # error code 0: no errors.
         common.inform("Done.")
+    finally:
+        if progress_line:
+            common.redirect(None)
+            progress_line.stop()
 
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ from repobee_canvas.gui import (
     DEFAULT_COURSE_ID,
     KEY_ACCESS_TOKEN,
     KEY_BASE_URL,
+    KEY_CANCEL,
     KEY_CLEAR,
     KEY_CLONE_COURSE,
     KEY_COL_PERCENT,
@@ -21,7 +22,6 @@ from repobee_canvas.gui import (
     KEY_EDIT_TOKEN,
     KEY_EDIT_URL,
     KEY_EMAIL,
-    KEY_END,
     KEY_EXECUTE,
     KEY_EXIT,
     KEY_FULL_GROUPS,
@@ -32,6 +32,7 @@ from repobee_canvas.gui import (
     KEY_INC_MEMBER,
     KEY_INFO_FILE_FOLDER,
     KEY_INFO_FILE_FOLDER_FB,
+    KEY_JOB_DONE,
     KEY_MEM_BOTH,
     KEY_MEMBER_OPTION,
     KEY_ML,
@@ -65,12 +66,18 @@ from repobee_canvas.gui import (
 
 def main():
     common.CLI = False
+    app = gui.context()
     gui.set_default_entries()
     window = gui.make_window()
+    gui.attach_tooltips(window)
     last_screen_height = window.Size[1]
 
     while True:
-        event, values = window.read()
+        # While a job runs, its progress is drawn once per frame.
+        event, values = window.read(timeout=gui.FRAME_INTERVAL if app.job else None)
+        gui.draw_progress()
+        if event == sg.TIMEOUT_EVENT:
+            continue
 
         if event in (KEY_EXIT, sg.WIN_CLOSED):  # if user closes window
             break
@@ -123,7 +130,7 @@ def main():
             )
             if course_id:
                 update_course_settings(
-                    window, course_id, get_entry(gui.course_id), MODE_CLONE
+                    window, course_id, get_entry(app.course_id), MODE_CLONE
                 )
 
         elif event == KEY_NEW_COURSE:
@@ -136,7 +143,7 @@ def main():
         elif event == KEY_COURSES:
             course_id = values[event].split(" ")[1]
             update_course_settings(
-                window, course_id, gui.settings[course_id], MODE_PARSE
+                window, course_id, app.settings[course_id], MODE_PARSE
             )
 
         elif event == "Conf":
@@ -161,7 +168,7 @@ def main():
             set_update_course_info(
                 window,
                 KEY_BASE_URL,
-                gui.course_info.course[KEY_URL_OPTIONS][values[event]],
+                app.course_info.course[KEY_URL_OPTIONS][values[event]],
             )
             gui.check_url_lock(window[KEY_EDIT_URL], values[KEY_URL_OPTION])
 
@@ -175,25 +182,19 @@ def main():
                 continue
 
             if event == KEY_VERIFY:
-                course_title = window[KEY_COURSES].DefaultValue
-                courses_list = window[KEY_COURSES].Values
-                ind = courses_list.index(course_title)
                 common.inform("Verifying...")
-                course_name = VerifyCourseByID(
-                    base_url, access_token, int(gui.course_id)
+                course_id = int(app.course_id)
+                # The verified name belongs to this course, whichever course
+                # is selected once the job ends.
+                course = app.course_info
+                gui.start_job(
+                    window,
+                    KEY_VERIFY,
+                    lambda: (
+                        course,
+                        VerifyCourseByID(base_url, access_token, course_id),
+                    ),
                 )
-                if (
-                    course_name
-                    and gui.course_info.course[KEY_COURSE_NAME] != course_name
-                ):
-                    set_course_info(KEY_COURSE_NAME, course_name)
-                    course_title = gui.course_info.get_course_title()
-                    courses_list[ind] = course_title
-                    gui.update_courses_list(window, courses_list)
-                    window[KEY_COURSES].update(value=course_title)
-
-                if course_name:
-                    common.inform("All settings successfully verified")
                 continue
 
             csv = values[CSV]
@@ -204,7 +205,7 @@ def main():
                 popup("Please at least select one file to create.")
                 continue
 
-            current_course = gui.course_info.get()
+            current_course = app.course_info.get()
             stu_csv_info_file = None
             stu_xlsx_info_file = None
             stu_teammates_file = None
@@ -250,28 +251,54 @@ def main():
             only_full_groups = values[KEY_FULL_GROUPS]
 
             common.inform("Executing the Execute command...")
-            gui.disable_all_buttons(window)
-            window.perform_long_operation(
+            course_id = int(app.course_id)
+            gui.start_job(
+                window,
+                KEY_EXECUTE,
                 lambda: CreateStudentsFiles(
                     base_url,
                     access_token,
-                    int(gui.course_id),
+                    course_id,
                     stu_csv_info_file,
                     stu_xlsx_info_file,
                     students_yaml_file,
                     stu_teammates_file,
-                    gui.course_info.course[KEY_MEMBER_OPTION],
+                    app.course_info.course[KEY_MEMBER_OPTION],
                     include_group,
                     include_member,
                     include_initials,
                     only_full_groups
                 ),
-                KEY_END,
             )
 
-        elif event == KEY_END:
-            common.inform("Done")
-            gui.enable_all_buttons(window)
+        elif event == KEY_CANCEL:
+            common.inform("Cancelling...")
+            gui.cancel_job()
+
+        elif event == KEY_JOB_DONE:
+            job = gui.end_job(window)
+            if job.cancelled:
+                common.inform("Cancelled")
+            elif job.error:
+                common.fault(f"{job.name} failed", job.error)
+            elif job.name == KEY_VERIFY:
+                course, course_name = job.result
+                if course_name and course.course[KEY_COURSE_NAME] != course_name:
+                    old_title = course.get_course_title()
+                    course.update(KEY_COURSE_NAME, course_name)
+                    courses_list = window[KEY_COURSES].Values
+                    if old_title in courses_list:
+                        ind = courses_list.index(old_title)
+                        courses_list[ind] = course.get_course_title()
+                        gui.update_courses_list(window, courses_list)
+                    window[KEY_COURSES].update(
+                        value=app.course_info.get_course_title()
+                    )
+
+                if course_name:
+                    common.inform("All settings successfully verified")
+            else:
+                common.inform("Done")
 
         elif event == KEY_HELP:
             common.inform(gui.help_info)
@@ -299,3 +326,4 @@ def main():
             gui.update_progress(0, 100)
 
     window.close()
+    app.settings.flush()
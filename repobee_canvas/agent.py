@@ -0,0 +1,166 @@
+"""Run commands in a long-running agent to skip the startup of each command.
+
+The agent listens on a Unix socket. A client sends it one request: a JSON
+line with the name of a command and its keyword arguments. The agent runs
+the command and streams each message of the command back as a JSON line,
+followed by a line marking the end of the command. Because the agent keeps
+running, its Canvas clients keep their connections open and its courses
+stay found between commands.
+
+The agent runs one command at a time. File paths are made absolute by the
+client, since the agent does not share its working directory. On platforms
+without Unix sockets, such as Windows, there is no agent and the client
+runs the commands itself.
+
+Classes:
+- AgentServer: The agent, answering requests on a Unix socket.
+
+Functions:
+- forward: Run a command in the agent, if it is running.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from .common import redirect
+
+DEFAULT_AGENT_SOCKET = Path.home() / ".canvas_info" / "agent.sock"
+CONNECT_TIMEOUT = 0.5
+
+# Whether the platform has Unix sockets; standard CPython on Windows does not.
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+# Keyword arguments of the commands that are file paths.
+PATH_ARGUMENTS = {
+    "student_csv_info_file",
+    "student_xlsx_info_file",
+    "students_yaml_file",
+    "students_teammates_file",
+    "cache_dir",
+    "snapshot_db",
+    "diff_report",
+}
+
+
+class AgentUnavailable(Exception):
+    """No agent is listening on the socket."""
+
+
+def default_commands() -> Dict[str, Callable]:
+    from .command.create_students_files import CreateStudentsFiles
+    from .command.verify_course_id import VerifyCourseByID
+
+    return {"info": CreateStudentsFiles, "verify": VerifyCourseByID}
+
+
+class AgentHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # Commands show messages from several threads.
+        self.sending = threading.Lock()
+        try:
+            request = json.loads(self.rfile.readline())
+            command = self.server.commands[request["command"]]
+        except (ValueError, KeyError) as e:
+            self.send({"done": True, "error": f"Invalid request: {e}"})
+            return
+
+        with self.server.running:
+            previous = redirect(lambda message: self.send({"message": message}))
+            try:
+                command(**request.get("kwargs", {}))
+                self.send({"done": True})
+            except Exception as e:
+                self.send({"done": True, "error": str(e)})
+            finally:
+                redirect(previous)
+
+    def send(self, content: dict):
+        try:
+            with self.sending:
+                self.wfile.write(json.dumps(content).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except OSError:
+            # The client went away; the command runs to its end regardless.
+            pass
+
+
+if UNIX_SOCKETS:
+
+    class AgentServer(socketserver.ThreadingUnixStreamServer):
+        """The agent listening on socket_path, running the commands by name.
+
+        The socket is only accessible to the user running the agent, because
+        requests contain access tokens.
+        """
+
+        daemon_threads = True
+
+        def __init__(
+            self,
+            socket_path: Path | str = DEFAULT_AGENT_SOCKET,
+            commands: Optional[Dict[str, Callable]] = None,
+        ):
+            socket_path = Path(socket_path)
+            socket_path.parent.mkdir(parents=True, exist_ok=True)
+            socket_path.unlink(missing_ok=True)
+
+            umask = os.umask(0o077)
+            try:
+                super(AgentServer, self).__init__(str(socket_path), AgentHandler)
+            finally:
+                os.umask(umask)
+            self.socket_path = socket_path
+            self.commands = commands or default_commands()
+            self.running = threading.Lock()
+
+        def server_close(self):
+            super(AgentServer, self).server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+
+def forward(
+    command: str,
+    kwargs: dict,
+    socket_path: Path | str = DEFAULT_AGENT_SOCKET,
+):
+    """Run command with kwargs in the agent, printing its messages.
+
+    Raise AgentUnavailable if no agent listens on socket_path, or the
+    platform has no Unix sockets, and RuntimeError if the command failed in
+    the agent.
+    """
+    if not UNIX_SOCKETS:
+        raise AgentUnavailable("Unix sockets are not supported on this platform.")
+
+    kwargs = {
+        name: os.path.abspath(value) if name in PATH_ARGUMENTS and value else value
+        for name, value in kwargs.items()
+    }
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(CONNECT_TIMEOUT)
+    try:
+        connection.connect(str(socket_path))
+    except OSError as e:
+        connection.close()
+        raise AgentUnavailable(str(e))
+
+    connection.settimeout(None)
+    with connection, connection.makefile("rwb") as stream:
+        request = {"command": command, "kwargs": kwargs}
+        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        stream.flush()
+        for line in stream:
+            reply = json.loads(line)
+            if "message" in reply:
+                print(reply["message"])
+            if reply.get("done"):
+                if reply.get("error"):
+                    raise RuntimeError(reply["error"])
+                return
+    raise RuntimeError("The agent stopped before the command finished.")
@@ -20,120 +20,126 @@ name is convenient.
 
 """
 import csv
+import hashlib
+import io
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict
-
-import xlsxwriter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 from canvasapi.course import Course
 from canvasapi.user import User
-from canvasapi.group import Group, GroupMembership
+from canvasapi.group import Group
 from canvasapi.enrollment import Enrollment
 from canvasapi.paginated_list import PaginatedList
-from .common import inform, warn
-from .gui import update_progress
-
-CANVAS_ID = "canvas_id"
-FIELD_SEP = ","
-GIT_ID = "GitID"
-FULL_NAME = "FullName"
-GROUP = "Group"
-ID = "ID"
-EMAIL = "Mail"
-NAME = "Name"
+from .columns import (
+    CANVAS_ID,
+    COLUMNS,
+    EMAIL,
+    FIELD_SEP,
+    FULL_NAME,
+    GIT_ID,
+    GROUP,
+    ID,
+    NAME,
+)
+from .common import inform, show_progress, warn
+from .defaults import DEFAULT_CONCURRENCY
+from .progress import ENROLLMENTS, GROUPS, PROFILES, USERS
+from .records import GroupRef, Row, group_ref
+from .snapshot import Snapshot, SnapshotStore, StoredGroup, StoredStudent
+from .writers import (
+    TEAMMATES_COLUMNS,
+    CsvWriter,
+    ExcelWriter,
+    TeammatesWriter,
+    teammates_row,
+    write_rows,
+)
+
 HEAD = 5
+AHEAD = 4
+STUDENT_ENROLLMENT = "StudentEnrollment"
+PAGE_SIZE = 100
+
+# Profile fields used in the table and the user attributes they are listed as.
+PROFILE_FIELDS = {
+    "primary_email": "email",
+    "login_id": "login_id",
+    "sis_user_id": "sis_user_id",
+}
+
+
+# The columns that can be looked up in a Table.
+INDEXED_COLUMNS = [EMAIL, GIT_ID, ID, CANVAS_ID, GROUP]
 
 
 class Table:
-    """Table"""
+    """Table
+
+    The rows can be looked up by email address, Git ID, login ID, Canvas user
+    ID and group. The index of a column is built on the first lookup in that
+    column; later lookups take constant time.
+    """
 
     def __init__(self, data: List):
         self._data = data
+        self._indexes: Dict[str, Dict[str, List[dict]]] = {}
 
     @classmethod
-    def load(cls, path: Path):
-        """Load Table from a csv file."""
-        with path.open() as csv_file:
-            return cls(csv.DictReader(csv_file, delimiter=FIELD_SEP))
+    def load(cls, path: Path | str, lazy: bool = False):
+        """Load Table from a csv file written by write.
+
+        The file is read at once and the IDs are converted to ints, as in a
+        table created from Canvas. Students in the same group share a GroupRef
+        with the group's name and the number of its students in the file.
+
+        If lazy is true, the rows are read from the file each time they are
+        iterated instead, so a huge file is never held in memory. The groups
+        of a lazy table do not know their number of members.
+        """
+        path = Path(path)
+        if lazy:
+            return cls(CsvRows(path))
+
+        text = path.read_text(encoding="utf-8-sig")
+        rows = list(read_rows(io.StringIO(text, newline=None), {}))
+
+        counts = Counter(row[GROUP].name for row in rows if row.get(GROUP))
+        groups = {
+            name: GroupRef(None, name, count, None) for name, count in counts.items()
+        }
+        for row in rows:
+            if row.get(GROUP):
+                row[GROUP] = groups[row[GROUP].name]
+        return cls(rows)
 
     def write(self, path: Path):
-        # """Write this Canvas-Git map to csv file."""
-        with path.open("w", encoding="utf-8-sig", newline="") as csv_file:
-
-            csv_writer = csv.DictWriter(
-                csv_file,
-                delimiter=FIELD_SEP,
-                fieldnames=list(self.columns()),
-            )
-
-            csv_writer.writeheader()
-
-            for row in self.rows():
-                text_to_write = row.copy()
-                if isinstance(row[GROUP], Group):
-                    text_to_write[GROUP] = row[GROUP].name
-                csv_writer.writerow(row)
+        """Write this Canvas-Git map to csv file."""
+        write_rows(self.rows(), [CsvWriter(path, self.columns())])
 
     def writeExcel(self, path: str):
-        headers = []
-        columns = self.columns()
-        for col in columns:
-            headers.append({"header": col})
-
-        workbook = xlsxwriter.Workbook(path)
-        worksheet = workbook.add_worksheet()
-        worksheet.set_column("B:B", 15)  # name column 15
-        worksheet.set_column("C:C", 25)  # full name column 25
-        worksheet.set_column("G:G", 45)  # set email column_width 45
-
-        rows = []
-        for row in self.rows():
-            text_to_write = row.copy()
-            if isinstance(row[GROUP], Group):
-                text_to_write[GROUP] = row[GROUP].name
-            rows.append(list(text_to_write.values()))
-
-        worksheet.add_table(
-            "A1:G" + str(len(rows) + 1),
-            {"data": rows, "columns": headers},
-        )
-
-        workbook.close()
+        write_rows(self.rows(), [ExcelWriter(path, self.columns())])
 
     def reformatTeammates(self):
-        rows = [["Section", "Team", "Name", "Email", "Comments"]]
+        rows = [TEAMMATES_COLUMNS]
         for row in self.rows():
-            section = ""
-            team = ""
-            if row[GROUP] != "":
-                section = int(int(row[GROUP].name) / 100)
-                team = row[GROUP].name
-            rows.append([section, team, row[FULL_NAME], row[EMAIL], row[ID]])
+            rows.append(teammates_row(row))
         return rows
 
     def writeTeammatesExcel(self, path: str):
-        rows = self.reformatTeammates()
-
-        workbook = xlsxwriter.Workbook(path)
-        worksheet = workbook.add_worksheet()
-        worksheet.set_column("C:C", 25)  # full name column 25
-        worksheet.set_column("D:D", 40)  # set email column_width 45
-
-        row = 0
-        # Iterate over the data and write it out row by row.
-        for data in rows:
-            for col, d in enumerate(data):
-                worksheet.write(row, col, d)
-            row += 1
-
-        workbook.close()
+        write_rows(self.rows(), [TeammatesWriter(path)])
 
     def columns(self):
         """Generator for the column names of this Table."""
         columns = []
 
-        if len(self._data) > 0:
-            columns = list(self._data[0].keys())
+        for row in self._data:
+            columns = list(row.keys())
+            break
 
         return columns
 
@@ -142,98 +148,581 @@ class Table:
         for row in self._data:
             yield row
 
+    def __len__(self) -> int:
+        try:
+            return len(self._data)
+        except TypeError:
+            return sum(1 for _ in self._data)
+
     def empty(self):
         """Return true if this table is empty, false otherwise."""
-        return 0 == len(self._data)
+        return next(iter(self._data), None) is None
+
+    def find(self, column: str, value) -> Optional[dict]:
+        """Return the row with value in column, or None if there is none.
+
+        Values are compared as text, so 1001 finds the Git ID "1001" of a
+        loaded table; email addresses are compared case insensitively.
+        """
+        matches = self._index(column).get(index_key(column, value))
+        return matches[0] if matches else None
+
+    def find_all(self, column: str, values: Iterable) -> List[Optional[dict]]:
+        """Return the row with each value in column, None for missing values."""
+        index = self._index(column)
+        matches = (index.get(index_key(column, value)) for value in values)
+        return [rows[0] if rows else None for rows in matches]
+
+    def members(self, group) -> List[dict]:
+        """Return the rows of the students in group, given by name."""
+        return list(self._index(GROUP).get(index_key(GROUP, group), []))
+
+    def git_ids(self, canvas_ids: Iterable[int]) -> List[Optional[str]]:
+        """Map each Canvas user ID to the Git ID of that student."""
+        return [
+            row[GIT_ID] if row else None
+            for row in self.find_all(CANVAS_ID, canvas_ids)
+        ]
+
+    def canvas_ids(self, git_ids: Iterable[str]) -> List[Optional[int]]:
+        """Map each Git ID to the Canvas user ID of that student."""
+        return [
+            canvas_id(row) if row else None
+            for row in self.find_all(GIT_ID, git_ids)
+        ]
+
+    def build_indexes(self):
+        """Build the indexes of all columns now instead of on first use."""
+        for column in INDEXED_COLUMNS:
+            self._index(column)
+
+    def _index(self, column: str) -> Dict[str, List[dict]]:
+        if column not in INDEXED_COLUMNS:
+            raise KeyError(f"Column '{column}' is not indexed.")
+        if column not in self._indexes:
+            index: Dict[str, List[dict]] = {}
+            for row in self._data:
+                value = canvas_id(row) if column == CANVAS_ID else row.get(column)
+                if value not in (None, ""):
+                    index.setdefault(index_key(column, value), []).append(row)
+            self._indexes[column] = index
+        return self._indexes[column]
 
     def get_stu_info(self) -> list:
         student_info = []
         for row in self.rows():
-            student_info.append(
-                {"group": row[GROUP], "email2git": {row[EMAIL]: str(row[GIT_ID])}}
-            )
+            student_info.append(stu_info(row))
 
         return student_info
 
 
-def canvas_git_map_table_wizard(course: Course) -> Table:
-    """Create a Canvas-Git map CSV file."""
-    inform("Getting the students' information...")
-    students: PaginatedList[User] = course.get_users()
+class CsvRows:
+    """The rows of a csv file, read from the file on each iteration."""
 
-    if not students._is_larger_than(0):
-        warn(f"No students found for course '{course.name}'.")
-        return Table([])
+    def __init__(self, path: Path):
+        self.path = path
 
-    inform(f"Found students for this course.")
+    def __iter__(self) -> Iterator[dict]:
+        with self.path.open(encoding="utf-8-sig", newline="") as csv_file:
+            yield from read_rows(csv_file, {})
 
-    inform("Getting the information of groups...")
-    group_members: Dict[str, Group] = {}
-    groups: PaginatedList[Group] = course.get_groups()
-    for group in groups:
-        memberships: PaginatedList[GroupMembership] = group.get_memberships()
-        for member in memberships:
-            group_members[member.user_id] = group
 
-    inform("Getting the information of enrollments...")
-    user_enrollment: Dict[str, str] = {}
-    enrollments: PaginatedList[Enrollment] = course.get_enrollments()
-    for enrollment in enrollments:
-        user_enrollment[enrollment.user_id] = enrollment.role
+def read_rows(lines: Iterable[str], groups: Dict[str, GroupRef]) -> Iterator[dict]:
+    """Generate the typed rows of the csv lines of a Canvas-Git map.
 
-    data = []
+    Files with the columns of a table created from Canvas give compact rows,
+    other files give dicts. Groups are looked up by name in groups, and added
+    to it when new.
+    """
+    reader = csv.reader(lines, delimiter=FIELD_SEP)
+    header = next(reader, None)
+    if header is None:
+        return
+    compact = sorted(header) == sorted(COLUMNS)
 
-    inform("Processing students...")
-    i = 0
-    total = len(user_enrollment)
-    for student in students:
-        i += 1
-        update_progress(i, total)
-        if user_enrollment[student.id] != "StudentEnrollment":
+    for values in reader:
+        if not values:
             continue
-        row = {}
-        profile = student.get_profile()
-        if hasattr(student, "id"):
-            user_id = student.id
-            if user_id in group_members:
-                row[GROUP] = group_members[user_id]
-            else:
-                row[GROUP] = ""
+        fields = dict(zip(header, values))
+        for column in (ID, GIT_ID):
+            if column in fields:
+                fields[column] = typed_id(fields[column])
+        if fields.get(GROUP):
+            name = sys.intern(fields[GROUP])
+            if name not in groups:
+                groups[name] = GroupRef(None, name, None, None)
+            fields[GROUP] = groups[name]
+
+        if compact:
+            yield Row(*(fields[column] for column in COLUMNS))
         else:
-            row[GROUP] = ""
-
-        email = ""
-        if "primary_email" in profile:
-            email = profile['primary_email']
-            row[NAME] = email[:-15].split(".")[-1]
-        else:
-            warn("No email address found of student. Do you have the 'Teacher' role in Canvas?")
-            row[NAME] = ""
-
-        if hasattr(student, "short_name"):
-            row[FULL_NAME] = student.short_name
-        else:
-            row[FULL_NAME] = ""
+            yield fields
+
+
+def typed_id(value: str):
+    """Convert a login or Git ID read from a file to an int, if it is one."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def canvas_id(row: dict) -> Optional[int]:
+    """Return the Canvas user ID of the student in row, if known."""
+    if isinstance(row, Row):
+        return row.user_id
+    return row.get(CANVAS_ID)
+
+
+def index_key(column: str, value) -> str:
+    """Normalize value to its key in the index of column."""
+    if column == GROUP and hasattr(value, "name"):
+        value = value.name
+    key = str(value).strip()
+    return key.lower() if column == EMAIL else key
+
+
+def stu_info(row: dict) -> dict:
+    """Return the group and email to Git ID mapping of the student in row."""
+    return {"group": row[GROUP], "email2git": {row[EMAIL]: str(row[GIT_ID])}}
+
+
+def canvas_git_map_table_wizard(
+    course: Course,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    bulk: bool = True,
+    active_only: bool = False,
+    snapshots: Optional[SnapshotStore] = None,
+    full: bool = False,
+) -> Table:
+    """Create a Canvas-Git map table, see canvas_git_map_rows."""
+    return Table(
+        list(
+            canvas_git_map_rows(
+                course, concurrency, bulk, active_only, snapshots, full
+            )
+        )
+    )
+
+
+def canvas_git_map_rows(
+    course: Course,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    bulk: bool = True,
+    active_only: bool = False,
+    snapshots: Optional[SnapshotStore] = None,
+    full: bool = False,
+) -> Iterator[Row]:
+    """Generate the rows of a Canvas-Git map, in roster order.
+
+    Each row is yielded as soon as it is complete, so writers can process it
+    while the profiles of the next students are still being fetched.
+
+    In bulk mode, the profile fields of the students are read from the user
+    and enrollment listings and the group members from the group listing, so
+    the whole roster costs a request per page. Profiles that are still
+    incomplete are fetched by a pool of at most `concurrency` workers.
+
+    The students, groups and enrollments are fetched concurrently; the rows
+    are joined as soon as all three are available. Canvas only lists the
+    users enrolled as a student, and with active_only only those whose
+    enrollment is active.
+
+    If a snapshot store is given, the rows are stored in it once all rows
+    have been generated. Unless full is
+    true, students whose enrollment and group did not change since the
+    previous snapshot reuse their stored row instead of being processed again.
+    """
+    inform("Getting the information of students, groups and enrollments...")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        students_phase = executor.submit(
+            timed, "students", load_students, course, bulk, active_only
+        )
+        groups_phase = executor.submit(
+            timed, "groups", load_group_members, course, concurrency, bulk
+        )
+        enrollments_phase = executor.submit(
+            timed, "enrollments", load_enrollments, course, bulk, active_only
+        )
+        students = students_phase.result()
+        group_members = groups_phase.result()
+        user_enrollment = enrollments_phase.result()
 
-        if "login_id" in profile:
-            try:
-                row[ID] = int(profile['login_id'])
-            except:
-                row[ID] = profile['login_id']
-        else:
-            row[ID] = ""
+    if not students:
+        warn(f"No students found for course '{course.name}'.")
+        return
 
-        if "sis_user_id" in profile:
-            try:
-                row[GIT_ID] = int(profile['sis_user_id'])
-            except:
-                row[GIT_ID] = profile['sis_user_id']
+    inform("Processing students...")
+    # The listings are filtered by Canvas already, this only skips users
+    # whose enrollment changed in between the requests.
+    enrolled = [
+        student
+        for student in students
+        if getattr(user_enrollment.get(student.id), "type", None)
+        == STUDENT_ENROLLMENT
+    ]
+
+    stamps = {
+        student.id: enrollment_stamp(
+            user_enrollment[student.id], group_members.get(student.id)
+        )
+        for student in enrolled
+    }
+
+    unchanged: Dict[int, StoredStudent] = {}
+    if snapshots and not full:
+        previous = snapshots.students(course.id)
+        unchanged = {
+            student.id: previous[student.id]
+            for student in enrolled
+            if student.id in previous
+            and previous[student.id].stamp == stamps[student.id]
+        }
+        if unchanged:
+            inform(f"Reusing {len(unchanged)} unchanged students of the previous run.")
+
+    changed = [student for student in enrolled if student.id not in unchanged]
+    changed_rows = student_rows(
+        changed, user_enrollment, group_members, concurrency, bulk
+    )
+
+    stored_students: List[StoredStudent] = []
+    stored_groups: Dict[int, StoredGroup] = {}
+    for student in enrolled:
+        if student.id in unchanged:
+            row = stored_row(unchanged[student.id], group_members)
         else:
-            row[GIT_ID] = ""
-
-        row[EMAIL] = email
+            row = next(changed_rows)
 
-        data.append(row)
-
-    update_progress(total, total)
-    return Table(data)
+        if snapshots:
+            stored_students.append(
+                stored_student(student.id, stamps[student.id], row)
+            )
+            if row[GROUP] and row[GROUP].id not in stored_groups:
+                stored_groups[row[GROUP].id] = stored_group(row[GROUP])
+
+        yield row
+
+    if snapshots:
+        snapshots.save(course.id, stored_students, stored_groups.values())
+
+
+def roster_fingerprint(
+    course: Course,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    active_only: bool = False,
+) -> str:
+    """Summarize the student enrollments and groups of the course in a hash.
+
+    The hash changes when a student is enrolled or unenrolled, when Canvas
+    updates an enrollment, or when a student joins, leaves or moves to
+    another group, or a group is renamed. It costs a listing of the
+    enrollments and a listing of the groups with their members, fetched
+    concurrently, instead of a full roster fetch.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        enrollments = executor.submit(load_enrollments, course, True, active_only)
+        groups = executor.submit(load_group_members, course, concurrency, True)
+        user_enrollment = enrollments.result()
+        group_members = groups.result()
+
+    digest = hashlib.sha256()
+    for user_id in sorted(user_enrollment):
+        enrollment = user_enrollment[user_id]
+        group = group_members.get(user_id)
+        digest.update(
+            "|".join(
+                [
+                    str(user_id),
+                    str(getattr(enrollment, "updated_at", None)),
+                    str(getattr(enrollment, "enrollment_state", None)),
+                    str(group.id if group else None),
+                    str(group.name if group else None),
+                ]
+            ).encode("utf-8")
+            + b"\n"
+        )
+    return digest.hexdigest()
+
+
+def student_rows(
+    students: List[User],
+    user_enrollment: Dict[str, Enrollment],
+    group_members: Dict[str, GroupRef],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    bulk: bool = True,
+) -> Iterator[Row]:
+    """Generate the rows of students in order, fetching incomplete profiles."""
+    if bulk:
+        profiles = [
+            bulk_profile(student, getattr(user_enrollment[student.id], "user", {}))
+            for student in students
+        ]
+    else:
+        profiles = [{} for _ in students]
+
+    incomplete = [
+        i
+        for i, profile in enumerate(profiles)
+        if not PROFILE_FIELDS.keys() <= profile.keys()
+    ]
+    if bulk and incomplete:
+        inform(f"Fetching the profiles of {len(incomplete)} students...")
+    fetched = fetch_profiles([students[i] for i in incomplete], concurrency)
+
+    incomplete = set(incomplete)
+    for i, (student, profile) in enumerate(zip(students, profiles)):
+        if i in incomplete:
+            profile = {**profile, **next(fetched)}
+        yield student_row(student, profile, group_members)
+
+
+def enrollment_stamp(enrollment: Enrollment, group: Optional[GroupRef]) -> str:
+    """Summarize the enrollment and group membership of a student.
+
+    The stamp changes when Canvas updates the enrollment, when the student is
+    active in the course, or when the student moves to another group.
+    """
+    return "|".join(
+        [
+            str(getattr(enrollment, "updated_at", None)),
+            str(getattr(enrollment, "last_activity_at", None)),
+            str(group.id if group else None),
+        ]
+    )
+
+
+def stored_student(user_id: int, stamp: str, row: dict) -> StoredStudent:
+    """Convert a row to a student to store in a snapshot."""
+    group = row[GROUP]
+    return StoredStudent(
+        user_id,
+        stamp,
+        group.id if group else None,
+        row[NAME],
+        row[FULL_NAME],
+        row[ID],
+        row[GIT_ID],
+        row[EMAIL],
+    )
+
+
+def stored_group(group: GroupRef) -> StoredGroup:
+    """Convert a group to a group to store in a snapshot."""
+    return StoredGroup(*group)
+
+
+def snapshot_table(snapshot: Snapshot) -> Table:
+    """Create the Canvas-Git map stored in snapshot, without contacting Canvas."""
+    groups = {
+        group_id: group_ref(group) for group_id, group in snapshot.groups.items()
+    }
+    group_members = {
+        student.user_id: groups[student.group_id]
+        for student in snapshot.students
+        if student.group_id in groups
+    }
+    return Table(
+        [stored_row(student, group_members) for student in snapshot.students]
+    )
+
+
+def stored_row(student: StoredStudent, group_members: Dict[str, GroupRef]) -> Row:
+    """Convert a student stored in a snapshot back to a row."""
+    return Row(
+        group_members.get(student.user_id, ""),
+        student.name,
+        student.full_name,
+        student.login_id,
+        student.git_id,
+        student.email,
+        student.user_id,
+    )
+
+
+def counted(phase: str, items: Iterable) -> Iterator:
+    """Generate the items of a listing, showing how many of phase are done."""
+    done = 0
+    for item in items:
+        done += 1
+        show_progress(phase, done)
+        yield item
+
+
+def timed(phase: str, function: Callable, *args):
+    """Call function with args and inform how long the phase took."""
+    start = time.perf_counter()
+    result = function(*args)
+    inform(f"Got the information of {phase} in {time.perf_counter() - start:.1f}s.")
+    return result
+
+
+def load_students(
+    course: Course, bulk: bool = True, active_only: bool = False
+) -> List[User]:
+    """Get the users of the course that are enrolled as a student."""
+    filters = {"enrollment_type": ["student"]}
+    if active_only:
+        filters["enrollment_state"] = ["active"]
+
+    if bulk:
+        students: PaginatedList[User] = course.get_users(
+            include=["email"], per_page=PAGE_SIZE, **filters
+        )
+    else:
+        students = course.get_users(**filters)
+    return list(counted(USERS, students))
+
+
+def load_enrollments(
+    course: Course, bulk: bool = True, active_only: bool = False
+) -> Dict[str, Enrollment]:
+    """Map the ID of each student in the course to its enrollment."""
+    filters = {"type": [STUDENT_ENROLLMENT]}
+    if active_only:
+        filters["state"] = ["active"]
+
+    if bulk:
+        enrollments: PaginatedList[Enrollment] = course.get_enrollments(
+            per_page=PAGE_SIZE, **filters
+        )
+    else:
+        enrollments = course.get_enrollments(**filters)
+    return {
+        enrollment.user_id: enrollment
+        for enrollment in counted(ENROLLMENTS, enrollments)
+    }
+
+
+def bulk_profile(student: User, enrolled_user: dict) -> dict:
+    """Collect the profile fields of a student from the roster listings.
+
+    The user listing provides the email address when asked for it, and both
+    listings provide the login and SIS IDs if the token may see them. Fields
+    that are absent from both are left out of the returned profile.
+    """
+    profile = {}
+    for field, attribute in PROFILE_FIELDS.items():
+        value = getattr(student, attribute, None) or enrolled_user.get(attribute)
+        if value:
+            profile[field] = value
+    return profile
+
+
+def fetch_profiles(
+    students: List[User], concurrency: int = DEFAULT_CONCURRENCY
+) -> Iterator[dict]:
+    """Fetch the profile of each student with a bounded pool of workers.
+
+    The profiles are generated in the same order as the students, whatever the
+    order in which the requests complete.
+    """
+    return map_concurrently(
+        lambda student: student.get_profile(),
+        students,
+        concurrency,
+        phase=PROFILES,
+    )
+
+
+def load_group_members(
+    course: Course, concurrency: int = DEFAULT_CONCURRENCY, bulk: bool = True
+) -> Dict[str, GroupRef]:
+    """Map the ID of each student in a group of the course to a GroupRef.
+
+    In bulk mode, the members are embedded in the group listing. The
+    memberships of groups listed without their members are requested
+    concurrently.
+    """
+    if bulk:
+        groups: List[Group] = list(
+            counted(GROUPS, course.get_groups(include=["users"], per_page=PAGE_SIZE))
+        )
+    else:
+        groups = list(counted(GROUPS, course.get_groups()))
+
+    listed = {
+        group.id: [user["id"] for user in group.users]
+        for group in groups
+        if hasattr(group, "users")
+    }
+    remaining = [group for group in groups if group.id not in listed]
+    memberships = map_concurrently(
+        lambda group: [member.user_id for member in group.get_memberships()],
+        remaining,
+        concurrency,
+    )
+    listed.update(zip([group.id for group in remaining], memberships))
+
+    group_members: Dict[str, GroupRef] = {}
+    for group in groups:
+        ref = group_ref(group)
+        for user_id in listed[group.id]:
+            group_members[user_id] = ref
+    return group_members
+
+
+def map_concurrently(
+    function: Callable,
+    items: List,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    phase: Optional[str] = None,
+) -> Iterator:
+    """Apply function to each item with a bounded pool of workers.
+
+    The results are generated in the same order as the items. At most
+    AHEAD times concurrency calls are in flight or waiting to be consumed, so
+    memory use does not grow with the number of items. If a phase is given,
+    its progress is shown each time a result is generated.
+    """
+    total = len(items)
+    concurrency = max(1, concurrency)
+    pending = iter(items)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = deque(
+            executor.submit(function, item)
+            for item in islice(pending, AHEAD * concurrency)
+        )
+        try:
+            done = 0
+            while futures:
+                result = futures.popleft().result()
+                for item in islice(pending, 1):
+                    futures.append(executor.submit(function, item))
+                done += 1
+                if phase:
+                    show_progress(phase, done, total)
+                yield result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def student_row(student: User, profile: dict, group_members: Dict[str, GroupRef]) -> Row:
+    """Create the Canvas-Git map row of a student from its profile."""
+    row = Row(user_id=getattr(student, "id", None))
+    if row.user_id in group_members:
+        row.group = group_members[row.user_id]
+
+    if "primary_email" in profile:
+        row.email = profile['primary_email']
+        row.name = row.email[:-15].split(".")[-1]
+    else:
+        warn("No email address found of student. Do you have the 'Teacher' role in Canvas?")
+
+    if hasattr(student, "short_name"):
+        row.full_name = student.short_name
+
+    if "login_id" in profile:
+        try:
+            row.login_id = int(profile['login_id'])
+        except:
+            row.login_id = profile['login_id']
+
+    if "sis_user_id" in profile:
+        try:
+            row.git_id = int(profile['sis_user_id'])
+        except:
+            row.git_id = profile['sis_user_id']
+
+    return row
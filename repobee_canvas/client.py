@@ -0,0 +1,198 @@
+"""Access a Canvas instance.
+
+Functions:
+- make_canvas: Create or reuse a Canvas client, optionally with an on-disk cache.
+- report_cache: Inform the user about the cache hits and misses of a client.
+- find_course: Look up a course by its ID.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from canvasapi import Canvas
+from canvasapi.course import Course
+from canvasapi.exceptions import (
+    Forbidden,
+    InvalidAccessToken,
+    ResourceDoesNotExist,
+    Unauthorized,
+)
+from canvasapi.paginated_list import PaginatedList
+from requests import PreparedRequest, Response, Session
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from requests.exceptions import ConnectionError
+
+from .common import inform
+from .http_cache import DEFAULT_TTL, CacheStats, CachingAdapter, DiskCache
+from .jobs import check_cancelled
+
+BASE_URL = "base_url"
+ACCESS_TOKEN = "access_token"
+COURSE_ID = "course_id"
+OTHER = "other"
+
+COURSE_TTL = DEFAULT_TTL
+
+# The clients created by make_canvas and the courses found with them.
+_clients: Dict[tuple, Canvas] = {}
+_courses: "WeakKeyDictionary[Canvas, Dict[int, Tuple[Course, float]]]" = (
+    WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def make_canvas(
+    base_url: str,
+    access_token: str,
+    cache_dir: Optional[Path | str] = None,
+    cache_ttl: Optional[int] = None,
+    pool_size: int = DEFAULT_POOLSIZE,
+) -> Canvas:
+    """Create a Canvas client keeping up to pool_size connections open.
+
+    If cache_dir is given, GET responses are cached in that directory and
+    reused for cache_ttl seconds, after which they are revalidated. Without
+    cache_ttl, each endpoint uses its default time to live, see http_cache.
+
+    Clients are reused within a process: asking again for a client with the
+    same arguments returns the first one, with its connections still open.
+    A client stops sending requests when the running job is cancelled, see
+    jobs.
+    """
+    pool_size = max(pool_size, DEFAULT_POOLSIZE)
+    key = (base_url, access_token, str(cache_dir or ""), cache_ttl, pool_size)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = _make_canvas(
+                base_url, access_token, cache_dir, cache_ttl, pool_size
+            )
+        return _clients[key]
+
+
+class CancellableAdapter(HTTPAdapter):
+    """Transport adapter that sends no more requests once the job is cancelled."""
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        check_cancelled()
+        return super(CancellableAdapter, self).send(request, **kwargs)
+
+
+class CancellableCachingAdapter(CancellableAdapter, CachingAdapter):
+    """Caching adapter that sends no more requests once the job is cancelled."""
+
+
+def _make_canvas(
+    base_url: str,
+    access_token: str,
+    cache_dir: Optional[Path | str],
+    cache_ttl: Optional[int],
+    pool_size: int,
+) -> Canvas:
+    canvas = Canvas(base_url, access_token)
+
+    if cache_dir:
+        adapter = CancellableCachingAdapter(
+            DiskCache(cache_dir), cache_ttl, pool_maxsize=pool_size
+        )
+    else:
+        adapter = CancellableAdapter(pool_maxsize=pool_size)
+
+    session = _session(canvas)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return canvas
+
+
+def cache_stats(canvas: Canvas) -> Optional[CacheStats]:
+    """Return the cache statistics of canvas so far, if it uses a cache."""
+    adapter = _session(canvas).get_adapter("https://")
+    if isinstance(adapter, CachingAdapter):
+        return adapter.current_stats()
+    return None
+
+
+def report_cache(canvas: Canvas, since: Optional[CacheStats] = None):
+    """Inform the user about the cache hits and misses of canvas.
+
+    Clients are reused, so a command reports the counts since the statistics
+    it took with cache_stats when it started.
+    """
+    stats = cache_stats(canvas)
+    if stats is not None:
+        inform(f"Cache: {stats - since if since else stats}")
+
+
+def _session(canvas: Canvas) -> Session:
+    return canvas._Canvas__requester._session
+
+
+class CourseLookupError(Exception):
+    """The course could not be found, reason tells which setting is wrong."""
+
+    def __init__(self, reason: str, error: BaseException):
+        super(CourseLookupError, self).__init__(str(error))
+        self.reason = reason
+        self.error = error
+
+
+def find_course(canvas: Canvas, course_id: int) -> Course:
+    """Find the course with course_id in a single request.
+
+    If the access token is not allowed to request the course directly, the
+    courses visible to the token are scanned instead. A course found with
+    the same client less than COURSE_TTL seconds ago is reused.
+    """
+    with _clients_lock:
+        found = _courses.setdefault(canvas, {}).get(course_id)
+    if found and time.monotonic() - found[1] < COURSE_TTL:
+        return found[0]
+
+    course = _find_course(canvas, course_id)
+    with _clients_lock:
+        _courses[canvas][course_id] = (course, time.monotonic())
+    return course
+
+
+def _find_course(canvas: Canvas, course_id: int) -> Course:
+    try:
+        return canvas.get_course(course_id)
+    except (Unauthorized, Forbidden):
+        return _scan_courses(canvas, course_id)
+    except ResourceDoesNotExist as e:
+        # A wrong base URL also results in "Not Found".
+        _check_base_url(canvas)
+        raise CourseLookupError(COURSE_ID, e)
+    except Exception as e:
+        raise _lookup_error(e)
+
+
+def _scan_courses(canvas: Canvas, course_id: int) -> Course:
+    try:
+        courses: PaginatedList[Course] = canvas.get_courses()
+        for course in courses:
+            if course.id == course_id:
+                return course
+    except Exception as e:
+        raise _lookup_error(e)
+
+    raise CourseLookupError(COURSE_ID, ResourceDoesNotExist("Not Found"))
+
+
+def _check_base_url(canvas: Canvas):
+    try:
+        canvas.get_current_user()
+    except (ResourceDoesNotExist, InvalidAccessToken, ConnectionError) as e:
+        raise _lookup_error(e)
+    except Exception:
+        pass
+
+
+def _lookup_error(error: BaseException) -> CourseLookupError:
+    if isinstance(error, (ResourceDoesNotExist, ConnectionError)):
+        return CourseLookupError(BASE_URL, error)
+    if isinstance(error, (InvalidAccessToken, Unauthorized)):
+        return CourseLookupError(ACCESS_TOKEN, error)
+    return CourseLookupError(OTHER, error)
@@ -0,0 +1,13 @@
+"""Column names of the Canvas-Git map table."""
+
+CANVAS_ID = "canvas_id"
+FIELD_SEP = ","
+GIT_ID = "GitID"
+FULL_NAME = "FullName"
+GROUP = "Group"
+ID = "ID"
+EMAIL = "Mail"
+NAME = "Name"
+
+# The columns of the table created from a Canvas course, in order.
+COLUMNS = [GROUP, NAME, FULL_NAME, ID, GIT_ID, EMAIL]
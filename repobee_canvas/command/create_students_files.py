@@ -2,19 +2,52 @@
 
 """
 
+from datetime import datetime
 from pathlib import Path
+from typing import Iterable, List
 
 from canvasapi import Canvas
 from canvasapi.course import Course
-from canvasapi.paginated_list import PaginatedList
 
-from ..canvas_git_map import canvas_git_map_table_wizard, Table
+from ..canvas_git_map import (
+    DEFAULT_CONCURRENCY,
+    canvas_git_map_rows,
+    snapshot_table,
+    stu_info,
+    Table,
+)
+from ..client import (
+    ACCESS_TOKEN,
+    BASE_URL,
+    COURSE_ID,
+    CourseLookupError,
+    cache_stats,
+    find_course,
+    make_canvas,
+    report_cache,
+)
 from ..common import fault, inform, warn
-from ..gui import KEY_EMAIL, KEY_GIT_ID, KEY_MEM_BOTH
+from ..snapshot import DEFAULT_SNAPSHOT_DB, SnapshotStore
+from ..keys import KEY_EMAIL, KEY_GIT_ID, KEY_MEM_BOTH
+from ..writers import (
+    CsvWriter,
+    ExcelWriter,
+    RosterDiffWriter,
+    RowWriter,
+    TeammatesWriter,
+    export_rows,
+    write_rows,
+)
 
 GROUP = "group"
 EMAIL2GIT = "email2git"
 
+LOOKUP_FAULTS = {
+    BASE_URL: "Erroneous Base URL",
+    ACCESS_TOKEN: "Erroneous Access Token",
+    COURSE_ID: "Non-existing Course ID",
+}
+
 
 def CreateStudentsFiles(
         canvas_base_url: str,
@@ -29,6 +62,15 @@ def CreateStudentsFiles(
         include_member: bool = False,
         include_initials: bool = False,
         only_full_groups: bool = True,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        bulk: bool = True,
+        active_only: bool = False,
+        cache_dir: str | None = None,
+        cache_ttl: int | None = None,
+        snapshot_db: str | None = None,
+        full: bool = False,
+        from_snapshot: bool = False,
+        diff_report: str | None = None,
 ):
     if (
             not student_csv_info_file
@@ -38,54 +80,148 @@ def CreateStudentsFiles(
     ):
         return
 
-    """Command to create a Canvas-Git mapping table and write it to a file."""
-    canvas: Canvas = Canvas(canvas_base_url, canvas_access_token)
-    inform("Loading course...")
+    """Command to create a Canvas-Git mapping table and write it to a file.
 
-    try:
-        courses: PaginatedList[Course] = canvas.get_courses()
-    except Exception as e:
-        if "Not Found" in str(e) or "Failed to establish a new connection" in str(e):
-            fault("Erroneous Base URL")
-        elif "Unauthorized" in str(e):
-            fault("Erroneous Access Token")
-        else:
-            fault(str(e))
+    With from_snapshot, the table is read from the latest snapshot of the
+    course in snapshot_db instead of being fetched from Canvas.
+
+    Files whose content did not change are left untouched. With diff_report,
+    the students added, removed and moved to another group since the
+    existing CSV file was written are reported in a JSON file.
+    """
+    canvas = started = None
+    if from_snapshot:
+        canvas_git_mapping_table = load_snapshot_table(
+            snapshot_db or DEFAULT_SNAPSHOT_DB, canvas_course_id
+        )
+        if canvas_git_mapping_table is None:
+            return
+        rows = canvas_git_mapping_table.rows()
+        snapshots = None
     else:
-        for course in courses:
-            if course.id == canvas_course_id:
-                course: Course = canvas.get_course(canvas_course_id)
-                canvas_git_mapping_table = canvas_git_map_table_wizard(course)
+        canvas: Canvas = make_canvas(
+            canvas_base_url,
+            canvas_access_token,
+            cache_dir,
+            cache_ttl,
+            pool_size=concurrency,
+        )
+        started = cache_stats(canvas)
+        inform("Loading course...")
 
-                if canvas_git_mapping_table.empty():
-                    warn("No students found.")
-                else:
-                    if student_csv_info_file:
-                        canvas_git_mapping_table.write(Path(student_csv_info_file))
-                        inform(
-                            f"Created students info CSV file::  {student_csv_info_file}"
-                        )
-
-                    if student_xlsx_info_file:
-                        canvas_git_mapping_table.writeExcel(student_xlsx_info_file)
-                        inform(
-                            f"Created students info Excel file:  {student_xlsx_info_file}"
-                        )
-
-                    if students_yaml_file:
-                        create_yaml_file(canvas_git_mapping_table, students_yaml_file, student_member_option,
-                                         include_group, include_member, include_initials, only_full_groups)
-
-                    if students_teammates_file:
-                        canvas_git_mapping_table.writeTeammatesExcel(
-                            students_teammates_file
-                        )
-                        inform(
-                            f"Created students info Teammates Excel file:  {students_teammates_file}"
-                        )
-
-                return
-        fault("Non-existing Course ID")
+        try:
+            course: Course = find_course(canvas, canvas_course_id)
+        except CourseLookupError as e:
+            fault(LOOKUP_FAULTS.get(e.reason, str(e)))
+            return
+
+        snapshots = SnapshotStore(snapshot_db) if snapshot_db else None
+        rows = canvas_git_map_rows(
+            course, concurrency, bulk, active_only, snapshots, full
+        )
+
+    try:
+        write_students_files(
+            rows,
+            student_csv_info_file,
+            student_xlsx_info_file,
+            students_yaml_file,
+            students_teammates_file,
+            student_member_option,
+            include_group,
+            include_member,
+            include_initials,
+            only_full_groups,
+            diff_report,
+        )
+    finally:
+        if snapshots:
+            snapshots.close()
+
+    if canvas:
+        report_cache(canvas, started)
+
+
+def write_students_files(
+        rows: Iterable[dict],
+        student_csv_info_file: str | None = None,
+        student_xlsx_info_file: str | None = None,
+        students_yaml_file: str | None = None,
+        students_teammates_file: str | None = None,
+        student_member_option: str = "email",
+        include_group: bool = False,
+        include_member: bool = False,
+        include_initials: bool = False,
+        only_full_groups: bool = True,
+        diff_report: str | None = None,
+) -> bool:
+    """Write rows to each of the given files, and report the outcome.
+
+    Return whether all files were written, a failed file is kept as it was.
+    """
+    # The rows stream from Canvas to all writers, which write each row as
+    # soon as it is produced.
+    writers: List[RowWriter] = []
+    if student_csv_info_file:
+        writers.append(CsvWriter(student_csv_info_file))
+    if student_xlsx_info_file:
+        writers.append(ExcelWriter(student_xlsx_info_file))
+    if students_yaml_file:
+        writers.append(
+            YamlWriter(
+                students_yaml_file,
+                student_member_option,
+                include_group,
+                include_member,
+                include_initials,
+                only_full_groups,
+            )
+        )
+    if students_teammates_file:
+        writers.append(TeammatesWriter(students_teammates_file))
+    if diff_report:
+        writers.append(
+            RosterDiffWriter(diff_report, previous_roster(student_csv_info_file))
+        )
+
+    succeeded = True
+    for result in export_rows(rows, writers):
+        writer = result.writer
+        if result.error:
+            succeeded = False
+            fault(f"Could not create {writer.description}: {writer.path}", result.error)
+        elif writer.opened and not writer.changed:
+            inform(f"Unchanged {writer.description}:  {writer.path}")
+        elif writer.opened:
+            inform(
+                f"Created {writer.description}:  {writer.path} "
+                f"({result.size()} bytes in {result.duration:.1f}s)"
+            )
+    return succeeded
+
+
+def previous_roster(student_csv_info_file: str | None) -> List[dict]:
+    """Load the rows of the existing students info CSV file, if any."""
+    if student_csv_info_file and Path(student_csv_info_file).is_file():
+        return list(Table.load(student_csv_info_file).rows())
+    return []
+
+
+def load_snapshot_table(snapshot_db: str | Path, canvas_course_id: int) -> Table | None:
+    """Load the Canvas-Git map of the latest snapshot of a course."""
+    snapshots = SnapshotStore(snapshot_db)
+    try:
+        snapshot = snapshots.latest(canvas_course_id)
+    finally:
+        snapshots.close()
+
+    if snapshot is None:
+        fault(f"No snapshot of course {canvas_course_id} in {snapshot_db}")
+        return None
+
+    fetched_at = datetime.fromtimestamp(snapshot.fetched_at)
+    inform(f"Using the snapshot fetched at {fetched_at:%Y-%m-%d %H:%M:%S}.")
+    return snapshot_table(snapshot)
 
 
 def create_yaml_file(
@@ -96,11 +232,74 @@ def create_yaml_file(
         include_member: bool = False,
         include_initials: bool = False,
         only_full_groups: bool = True,
+):
+    write_rows(
+        canvas_git_mapping_table.rows(),
+        [
+            YamlWriter(
+                students_yaml_file,
+                student_member_option,
+                include_group,
+                include_member,
+                include_initials,
+                only_full_groups,
+            )
+        ],
+    )
+    inform(f"Created students YAML file: {students_yaml_file}.")
+
+
+class YamlWriter(RowWriter):
+    """Collect the group and Git ID of each student, and write the students
+    YAML file once all rows are known."""
+
+    description = "students YAML file"
+
+    def __init__(
+            self,
+            students_yaml_file: str,
+            student_member_option: str = "email",
+            include_group: bool = False,
+            include_member: bool = False,
+            include_initials: bool = False,
+            only_full_groups: bool = True,
+    ):
+        super(YamlWriter, self).__init__(students_yaml_file)
+        self.student_member_option = student_member_option
+        self.include_group = include_group
+        self.include_member = include_member
+        self.include_initials = include_initials
+        self.only_full_groups = only_full_groups
+        self.student_info = []
+
+    def write_row(self, row: dict):
+        self.student_info.append(stu_info(row))
+
+    def close(self):
+        write_students_yaml(
+            self.student_info,
+            self.output,
+            self.student_member_option,
+            self.include_group,
+            self.include_member,
+            self.include_initials,
+            self.only_full_groups,
+        )
+
+
+def write_students_yaml(
+        student_info: list,
+        students_yaml_file: str | None = None,
+        student_member_option: str = "email",
+        include_group: bool = False,
+        include_member: bool = False,
+        include_initials: bool = False,
+        only_full_groups: bool = True,
 ):
     group_submissions = {}
     groupless_submissions = []
     smallgroup_submissions = []
-    for info in canvas_git_mapping_table.get_stu_info():
+    for info in student_info:
         group = info[GROUP]
         if group:
             if group in group_submissions:
@@ -171,10 +370,8 @@ def create_yaml_file(
         )
 
     else:
-        fault("Invalid member option.")
-        return
-
-    inform(f"Created students YAML file: {students_yaml_file}.")
+        # Raised, so the writer discards its output and the file is kept.
+        raise ValueError(f"Invalid member option: {student_member_option}")
 
     n = len(groupless_submissions)
     if n > 0: inform(f"The following {n} students were not in a group:")
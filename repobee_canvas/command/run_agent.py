@@ -0,0 +1,25 @@
+"""Run the agent to which the command line forwards its commands.
+
+"""
+
+from pathlib import Path
+
+from .. import agent
+from ..agent import DEFAULT_AGENT_SOCKET
+from ..common import fault, inform
+
+
+def RunAgent(socket_path: Path | str = DEFAULT_AGENT_SOCKET):
+    """Command to run the agent until interrupted with Ctrl+C."""
+    if not agent.UNIX_SOCKETS:
+        fault("The agent needs Unix sockets, which this platform does not have.")
+        return
+
+    server = agent.AgentServer(socket_path)
+    inform(f"Agent listening on {socket_path}, press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        inform("Stopped the agent.")
+    finally:
+        server.server_close()
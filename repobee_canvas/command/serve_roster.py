@@ -0,0 +1,28 @@
+"""Serve the Canvas-Git map of a students info file to local clients.
+
+"""
+
+from ..common import inform
+from ..lookup_server import DEFAULT_HOST, DEFAULT_PORT, RosterSource, make_server
+
+
+def ServeRoster(
+        student_csv_info_file: str,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        socket_path: str | None = None,
+):
+    """Command to answer Canvas-Git lookups until interrupted with Ctrl+C.
+
+    The students info file is loaded again whenever it is replaced.
+    """
+    roster = RosterSource(student_csv_info_file)
+    server = make_server(roster, host, port, socket_path)
+    address = socket_path or f"http://{host}:{server.server_address[1]}"
+    inform(f"Serving {student_csv_info_file} on {address}, press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        inform("Stopped serving.")
+    finally:
+        server.server_close()
@@ -6,18 +6,33 @@ from typing import Optional
 
 from canvasapi import Canvas
 from canvasapi.course import Course
-from canvasapi.paginated_list import PaginatedList
 
+from ..client import (
+    ACCESS_TOKEN,
+    BASE_URL,
+    COURSE_ID,
+    CourseLookupError,
+    cache_stats,
+    find_course,
+    make_canvas,
+    report_cache,
+)
 from ..common import fault, inform
 
 
 def VerifyCourseByID(
-    canvas_base_url: str, canvas_access_token: str, canvas_course_id: int
+    canvas_base_url: str,
+    canvas_access_token: str,
+    canvas_course_id: int,
+    cache_dir: Optional[str] = None,
+    cache_ttl: Optional[int] = None,
 ) -> Optional[str]:
     """Command to create a Canvas-Git mapping table and write it to a file."""
-    canvas = Canvas(canvas_base_url, canvas_access_token)
+    canvas = make_canvas(canvas_base_url, canvas_access_token, cache_dir, cache_ttl)
+    started = cache_stats(canvas)
 
     course_name = getCourseName(canvas, canvas_course_id)
+    report_cache(canvas, started)
     if not course_name:
         return None
 
@@ -26,20 +41,21 @@ def VerifyCourseByID(
 
 def getCourseName(canvas: Canvas, canvas_course_id: int) -> Optional[str]:
     try:
-        courses: PaginatedList[Course] = canvas.get_courses()
-    except Exception as e:
-        if "Not Found" in str(e) or "Failed to establish a new connection" in str(e):
+        course: Course = find_course(canvas, canvas_course_id)
+    except CourseLookupError as e:
+        if e.reason == BASE_URL:
             fault("Verifying Base URL: Failed")
-        elif "Unauthorized" in str(e):
+        elif e.reason == ACCESS_TOKEN:
             fault("Verifying Access Token: Failed")
+        elif e.reason == COURSE_ID:
+            inform("Verifying Base URL: Successful")
+            inform("Verifying Access Token: Successful")
+            fault("Verifying Course ID: Failed")
         else:
             fault(str(e))
-    else:
-        inform("Verifying Base URL: Successful")
-        inform("Verifying Access Token: Successful")
-        for course in courses:
-            if course.id == canvas_course_id:
-                inform("Verifying Course ID: Successful")
-                return course.name
-        fault("Verifying Course ID: Failed")
         return None
+
+    inform("Verifying Base URL: Successful")
+    inform("Verifying Access Token: Successful")
+    inform("Verifying Course ID: Successful")
+    return course.name
@@ -0,0 +1,131 @@
+"""Keep the students files of a Canvas course in sync with the course.
+
+"""
+
+import time
+
+from canvasapi import Canvas
+from canvasapi.course import Course
+from canvasapi.exceptions import CanvasException
+from requests.exceptions import RequestException
+
+from ..canvas_git_map import (
+    DEFAULT_CONCURRENCY,
+    canvas_git_map_rows,
+    roster_fingerprint,
+)
+from ..client import (
+    CourseLookupError,
+    cache_stats,
+    find_course,
+    make_canvas,
+    report_cache,
+)
+from ..common import fault, inform, warn
+from ..defaults import DEFAULT_INTERVAL
+from ..snapshot import SnapshotStore
+from .create_students_files import LOOKUP_FAULTS, write_students_files
+
+IN_MEMORY = ":memory:"
+
+# Cached responses are revalidated on every poll: the listings of a poll
+# expire together, so they never mix an old roster with a new one.
+WATCH_CACHE_TTL = 0
+
+
+def WatchCourse(
+        canvas_base_url: str,
+        canvas_access_token: str,
+        canvas_course_id: int,
+        student_csv_info_file: str | None = None,
+        student_xlsx_info_file: str | None = None,
+        students_yaml_file: str | None = None,
+        students_teammates_file: str | None = None,
+        student_member_option: str = "email",
+        include_group: bool = False,
+        include_member: bool = False,
+        include_initials: bool = False,
+        only_full_groups: bool = True,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        bulk: bool = True,
+        active_only: bool = False,
+        cache_dir: str | None = None,
+        snapshot_db: str | None = None,
+        diff_report: str | None = None,
+        interval: int = DEFAULT_INTERVAL,
+):
+    """Command to poll a Canvas course and update the students files on change.
+
+    The Canvas client is created once, so its connections stay open between
+    polls. Each poll only lists the enrollments and groups of the course; the
+    files are updated when their fingerprint changed. The rows are stored in
+    a snapshot store, in memory unless snapshot_db is given, so an update
+    only processes the students who changed. Stop watching with Ctrl+C.
+
+    With cache_dir, each cached response is revalidated with a conditional
+    request, which Canvas answers without a body when nothing changed.
+    """
+    canvas = watch_client(
+        canvas_base_url, canvas_access_token, cache_dir, concurrency
+    )
+    inform("Loading course...")
+
+    try:
+        course: Course = find_course(canvas, canvas_course_id)
+    except CourseLookupError as e:
+        fault(LOOKUP_FAULTS.get(e.reason, str(e)))
+        return
+
+    snapshots = SnapshotStore(snapshot_db or IN_MEMORY)
+    fingerprint = None
+    inform(f"Watching course '{course.name}' every {interval}s, press Ctrl+C to stop.")
+    try:
+        while True:
+            try:
+                started = cache_stats(canvas)
+                current = roster_fingerprint(course, concurrency, active_only)
+                if current != fingerprint:
+                    if fingerprint is not None:
+                        inform("The roster changed, updating the files...")
+                    written = write_students_files(
+                        canvas_git_map_rows(
+                            course, concurrency, bulk, active_only, snapshots
+                        ),
+                        student_csv_info_file,
+                        student_xlsx_info_file,
+                        students_yaml_file,
+                        students_teammates_file,
+                        student_member_option,
+                        include_group,
+                        include_member,
+                        include_initials,
+                        only_full_groups,
+                        diff_report,
+                    )
+                    # After a failure, the files are written again next time.
+                    if written:
+                        fingerprint = current
+                    report_cache(canvas, started)
+            except (CanvasException, RequestException) as e:
+                warn("Could not check the course, trying again later.", e)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        inform("Stopped watching.")
+    finally:
+        snapshots.close()
+
+
+def watch_client(
+        canvas_base_url: str,
+        canvas_access_token: str,
+        cache_dir: str | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+) -> Canvas:
+    """Create the Canvas client of a watch, revalidating its cache on each use."""
+    return make_canvas(
+        canvas_base_url,
+        canvas_access_token,
+        cache_dir,
+        WATCH_CACHE_TTL,
+        pool_size=concurrency,
+    )
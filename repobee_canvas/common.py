@@ -4,20 +4,63 @@ Functions:
 - inform: Show an informational message.
 - warn: Show a warning.
 - fault: Show an error message.
+- redirect: Send all messages elsewhere.
+- show_progress: Show the progress of a command.
+- on_progress: Set the function showing the progress.
+
+The GUI toolkit is only imported when a message is shown in the GUI, so the
+commands run without it on the command line.
 """
 
-import PySimpleGUI as sg
+from typing import Callable, Optional
 
 CLI = True
 
+# Receives all messages instead of the console while set, see redirect.
+_sink: Optional[Callable[[str], None]] = None
+
+# Shows the progress of a command, see on_progress.
+_progress: Optional[Callable[[str, int, Optional[int]], None]] = None
+
+
+def redirect(sink: Optional[Callable[[str], None]]):
+    """Send all messages to sink instead of the console, until reset to None.
+
+    Return the previous sink.
+    """
+    global _sink
+    previous = _sink
+    _sink = sink
+    return previous
+
 
 def cprint(msg: str, c=None) -> None:
-    if CLI:
+    if _sink:
+        _sink(msg)
+    elif CLI:
         print(msg)
     else:
+        import PySimpleGUI as sg
+
         sg.cprint(msg, c=c)
 
 
+def on_progress(show: Optional[Callable[[str, int, Optional[int]], None]]):
+    """Show the progress of commands with show, or nowhere if None.
+
+    show is called from the threads doing the work, so it should only record
+    the progress, see progress.ProgressStream.
+    """
+    global _progress
+    _progress = show
+
+
+def show_progress(phase: str, done: int, total: Optional[int] = None) -> None:
+    """Show that done of total items of phase are done, total None if unknown."""
+    if _progress:
+        _progress(phase, done, total)
+
+
 def warn(msg: str, error: BaseException = None) -> None:
     """Warn the user."""
     cprint(f"WARNING: {msg}", c="white on red")
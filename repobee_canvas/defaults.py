@@ -0,0 +1,21 @@
+"""The defaults of the options of the canvas-info commands.
+
+The defaults are shared by the commands and the CLI, so they are kept apart
+from the command code: the CLI shows them in its help and forwards commands
+to the agent without loading canvasapi and the other dependencies of the
+commands.
+"""
+
+from pathlib import Path
+
+# Number of profiles fetched from Canvas in parallel.
+DEFAULT_CONCURRENCY = 8
+
+# Seconds between two checks of the course in the watch action.
+DEFAULT_INTERVAL = 60
+
+# Address on which the serve action answers lookups.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+DEFAULT_SNAPSHOT_DB = Path.home() / ".canvas_info" / "snapshots.db"
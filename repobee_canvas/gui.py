@@ -1,8 +1,61 @@
 import PySimpleGUI as sg
 import base64
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple, Optional, Any
+from typing import Any, Callable, Optional, Tuple
+
+from . import common
+from .keys import (
+    CSV,
+    KEY_ACCESS_TOKEN,
+    KEY_BASE_URL,
+    KEY_CANCEL,
+    KEY_CLEAR,
+    KEY_CLONE_COURSE,
+    KEY_COL_PERCENT,
+    KEY_CONFIG_COL,
+    KEY_COURSES,
+    KEY_COURSE_ID,
+    KEY_COURSE_NAME,
+    KEY_CSV_INFO_FILE,
+    KEY_CUSTOM,
+    KEY_DELETE_COURSE,
+    KEY_EDIT_TOKEN,
+    KEY_EDIT_URL,
+    KEY_EMAIL,
+    KEY_EXECUTE,
+    KEY_EXIT,
+    KEY_FULL_GROUPS,
+    KEY_GIT_ID,
+    KEY_HELP,
+    KEY_INC_GROUP,
+    KEY_INC_INITIAL,
+    KEY_INC_MEMBER,
+    KEY_INFO_FILE_FOLDER,
+    KEY_INFO_FILE_FOLDER_FB,
+    KEY_JOB_DONE,
+    KEY_MEMBER_OPTION,
+    KEY_MEM_BOTH,
+    KEY_ML,
+    KEY_NEW_COURSE,
+    KEY_PRO_BAR,
+    KEY_PRO_TEXT,
+    KEY_STU_FILE,
+    KEY_STU_FILE_FOLDER,
+    KEY_TEAMMATES_INFO_FILE,
+    KEY_TUE,
+    KEY_URL_OPTION,
+    KEY_URL_OPTIONS,
+    KEY_VERIFY,
+    KEY_XLSX_INFO_FILE,
+    TEAMMATES,
+    XLSX,
+    YAML,
+)
+from .jobs import Job
+from .progress import ProgressStream
+from .settings import SettingsStore
 
 WINDOW_SIZE_X = 750
 WINDOW_SIZE_Y = 770
@@ -10,48 +63,7 @@ MAX_COL_HEIGHT = 400
 WINDOW_HEIGHT_CORR = 45  # height correction: height of command buttons + title bar
 COL_PERCENT = 60
 INIT_COL_HEIGHT = int((WINDOW_SIZE_Y - WINDOW_HEIGHT_CORR) * COL_PERCENT / 100)
-
-KEY_ACCESS_TOKEN = "canvas_access_token"
-KEY_BASE_URL = "canvas_base_url"
-KEY_COURSE_ID = "canvas_course_id"
-KEY_STU_FILE = "students_file"
-KEY_CSV_INFO_FILE = "stu_csv_info_file"
-KEY_XLSX_INFO_FILE = "stu_xlsx_info_file"
-KEY_TEAMMATES_INFO_FILE = "stu_teammates_info_file"
-KEY_INFO_FILE_FOLDER = "info_file_folder"
-KEY_INFO_FILE_FOLDER_FB = "info_file_folder_fb"  # folder browse
-KEY_STU_FILE_FOLDER = "students_file_folder"
-KEY_ML = "-ML-"
-KEY_PRO_BAR = "progressbar"
-KEY_PRO_TEXT = "progress"
-KEY_MEMBER_OPTION = "member_option"
-KEY_GIT_ID = "git_id"
-KEY_EMAIL = "email"
-KEY_MEM_BOTH = "(email, gitid)"
-KEY_FULL_GROUPS = "full_groups"
-KEY_REPO_NAME_OPTION = "repo_name_options"
-KEY_INC_GROUP = "include_group"
-KEY_INC_MEMBER = "include_member"
-KEY_INC_INITIAL = "include_initials"
-KEY_COL_PERCENT = "col_percent"
-KEY_HELP = "Help"
-KEY_EXECUTE = "Execute"
-KEY_EXIT = "Exit"
-KEY_CLEAR = "Clear"
-KEY_CONFIG_COL = "config_column"
-KEY_VERIFY = "Verify"
-KEY_COURSE_NAME = "course_name"
-KEY_COURSES = "courses"
-KEY_DELETE_COURSE = "delete_course"
-KEY_CLONE_COURSE = "clone_course"
-KEY_NEW_COURSE = "new_course"
-KEY_END = "end"
-KEY_TUE = "TUE"
-KEY_CUSTOM = "Custom"
-KEY_URL_OPTION = "url_option"
-KEY_URL_OPTIONS = "url_options"
-KEY_EDIT_TOKEN = "token_bt"
-KEY_EDIT_URL = "url_bt"
+FRAME_INTERVAL = 100  # milliseconds between two frames of the progress
 
 DEFAULT_INPUT_PAD = ((3, 5), 2)
 TEXT_CB_SIZE = 11
@@ -69,11 +81,6 @@ member_options_tip = "Options tip"
 yaml_options_tip = "repo option tip"
 help_info = "help info"
 
-CSV = "csv"
-YAML = "yaml"
-XLSX = "xlsx"
-TEAMMATES = "teammates"
-
 TYPE_YAML = ("Text Files", "*.yaml")
 
 DEFAULT_COURSE_ID = "00001"
@@ -121,19 +128,49 @@ BOOL_SETTINGS_KEY = [
     KEY_FULL_GROUPS,
 ]
 COURSE_SETTINGS_KEYS = TEXT_SETTINGS_KEY + BOOL_SETTINGS_KEY
-course_info = None
 course_title = "ID: {0}  Name: {1}"
 
-if sys.platform == "darwin":
-    sg.set_options(font=("Any", 12))
+# The tooltips of the help buttons, attached once the window is shown.
+tooltips = {}
 
-settings = sg.UserSettings()
-course_id = settings[KEY_COURSE_ID]
+
+class AppContext:
+    """The state of the GUI: its settings, the selected course and the progress.
+
+    The context is created on first use by context, so importing this module
+    reads no settings.
+    """
+
+    def __init__(self, settings: SettingsStore):
+        self.settings = settings
+        self.course_id: Optional[str] = settings[KEY_COURSE_ID]
+        self.course_info: Optional[Course] = None
+        self.progress_bar: Optional[sg.ProgressBar] = None
+        self.progress_text: Optional[sg.Text] = None
+        self.job: Optional[Job] = None
+        # The progress reported by the job, drawn once per frame.
+        self.progress = ProgressStream()
+
+
+_context: Optional[AppContext] = None
+
+
+def context() -> AppContext:
+    """Return the context of the GUI, reading the settings on first use."""
+    global _context
+    if _context is None:
+        if sys.platform == "darwin":
+            sg.set_options(font=("Any", 12))
+        # The settings file is named after the script, like PySimpleGUI does.
+        path = sg.UserSettings().get_filename()
+        _context = AppContext(SettingsStore(path))
+    return _context
 
 
 def set_default_entries():
+    app = context()
+    settings = app.settings
     col_percent = settings[KEY_COL_PERCENT]
-    updated = False
     if col_percent:
         global COL_PERCENT, INIT_COL_HEIGHT
         COL_PERCENT = col_percent
@@ -142,22 +179,17 @@ def set_default_entries():
             INIT_COL_HEIGHT = MAX_COL_HEIGHT
     else:
         settings.set(KEY_COL_PERCENT, COL_PERCENT)
-        updated = True
 
-    if not course_id:
+    if not app.course_id:
         create_template_course()
-        updated = True
-
-    if updated:
-        settings.load()
 
 
 def create_template_course():
-    global course_id, course_info
-    course_id = DEFAULT_COURSE_ID
-    course_info = Course(course_id, mode=MODE_CREATE)
-    settings.set(KEY_COURSE_ID, course_id)
-    settings.set(KEY_COURSES, [course_info.get_course_title()])
+    app = context()
+    app.course_id = DEFAULT_COURSE_ID
+    app.course_info = Course(app.course_id, mode=MODE_CREATE)
+    app.settings.set(KEY_COURSE_ID, app.course_id)
+    app.settings.set(KEY_COURSES, [app.course_info.get_course_title()])
 
 
 class Course:
@@ -233,13 +265,13 @@ def set_update_course_info(window: sg.Window, key: str, value: str):
 
 
 def set_course_info(key: str, value: Any):
-    global course_info
+    course_info = context().course_info
     if course_info:
         course_info.update(key, value)
 
 
 def set_course_url(key: str, value: str):
-    global course_info
+    course_info = context().course_info
     if course_info:
         course_info.update_url(key, value)
 
@@ -281,6 +313,7 @@ def valid_course_id(course_list: list, course_id: str) -> bool:
 
 
 def update_course_ui(window: sg.Window, course: dict):
+    course_info = context().course_info
     assert course_info is not None
     window[KEY_COURSES].update(value=course_info.get_course_title())
 
@@ -297,10 +330,10 @@ def update_course_ui(window: sg.Window, course: dict):
 def update_course_settings(
     window: sg.Window, id: str, course: Optional[dict], mode: int
 ):
-    global course_info, course_id
+    app = context()
     courses_list = window[KEY_COURSES].Values
-    course_id = id
-    course_info = Course(course_id, course=course, mode=mode)
+    app.course_id = id
+    app.course_info = course_info = Course(id, course=course, mode=mode)
     if mode in (MODE_CLONE, MODE_CREATE):
         course = course_info.get()
         window[KEY_COURSES].update(value=course_info.get_course_title())
@@ -309,12 +342,12 @@ def update_course_settings(
         courses_list.sort(reverse=True)
         update_courses_list(window, courses_list)
 
-    settings.set(KEY_COURSE_ID, course_id)
+    app.settings.set(KEY_COURSE_ID, id)
     update_course_ui(window, course_info.get())
 
 
 def delete_course_id(window: sg.Window):
-    global course_id, course_info
+    app = context()
     course_title = window[KEY_COURSES].DefaultValue
     courses_list = window[KEY_COURSES].Values
     ind = courses_list.index(course_title)
@@ -322,17 +355,17 @@ def delete_course_id(window: sg.Window):
     if ind < 0:
         ind = 0
     courses_list.remove(course_title)
-    sg.user_settings_delete_entry(course_id)
+    app.settings.delete(app.course_id)
     if len(courses_list) == 0:
         create_template_course()
-        courses_list = settings[KEY_COURSES]
+        courses_list = app.settings[KEY_COURSES]
     assert courses_list is not None
     update_courses_list(window, courses_list)
-    course_id = courses_list[ind].split(" ")[1]
-    settings.set(KEY_COURSE_ID, course_id)
-    course_info = Course(course_id, settings[course_id])
+    app.course_id = courses_list[ind].split(" ")[1]
+    app.settings.set(KEY_COURSE_ID, app.course_id)
+    app.course_info = Course(app.course_id, app.settings[app.course_id])
     window[KEY_COURSES].update(set_to_index=ind)
-    update_course_ui(window, course_info.get())
+    update_course_ui(window, app.course_info.get())
 
 
 def check_url_lock(button: sg.Button, url_option: str):
@@ -344,7 +377,7 @@ def check_url_lock(button: sg.Button, url_option: str):
 
 def update_courses_list(window: sg.Window, courses_list: list):
     window[KEY_COURSES].update(values=courses_list)
-    settings.set(KEY_COURSES, courses_list)
+    context().settings.set(KEY_COURSES, courses_list)
 
 
 def update_col_percent(window, wh, percent):
@@ -362,7 +395,7 @@ def resource_path(relative_path=None):
         # PyInstaller creates a temp folder and stores path in _MEIPASS
         base_path = sys._MEIPASS
     except Exception:
-        base_path = Path(".").resolve()
+        base_path = Path(__file__).resolve().parent.parent
 
     if relative_path is None:
         return base_path
@@ -370,27 +403,26 @@ def resource_path(relative_path=None):
     return Path(base_path) / relative_path
 
 
-icon = resource_path("icon.png")
-with open(icon, "rb") as file:
-    icon = base64.b64encode(file.read())
+@lru_cache(maxsize=None)
+def read_icon() -> bytes:
+    """Return the window icon, base64-encoded. The file is read only once."""
+    with open(resource_path("icon.png"), "rb") as file:
+        return base64.b64encode(file.read())
 
 
 def set_entry(key: str, val: Any):
-    sg.user_settings_set_entry(key, val)
+    context().settings.set(key, val)
 
 
 def get_entry(key: str) -> Any:
-    return sg.user_settings_get_entry(key)
-
-
-progress_bar = None
-progress_text = None
+    return context().settings[key]
 
 
 def progressBar(bar: sg.ProgressBar, text: sg.Text):
-    global progress_bar, progress_text
-    progress_bar = bar
-    progress_text = text
+    app = context()
+    app.progress_bar = bar
+    app.progress_text = text
+    common.on_progress(app.progress.report)
 
 
 def update_browse(file_path: str) -> str:
@@ -460,25 +492,91 @@ def is_path_invalid(path: str, file_type: str):
 
 
 def help_button(key: str, tooltip: str) -> sg.Button:
+    """Create a help button; its tooltip is attached by attach_tooltips."""
     buttons.append(key)
-    return sg.Button("?", key=key, tooltip=tooltip, pad=(3, 0))
+    tooltips[key] = tooltip
+    return sg.Button("?", key=key, pad=(3, 0))
+
+
+def attach_tooltips(window: sg.Window):
+    """Attach the tooltips of the help buttons, once the window is shown."""
+    for key, tooltip in tooltips.items():
+        element = window.find_element(key, silent_on_error=True)
+        if element is not None and element.TooltipObject is None:
+            element.set_tooltip(tooltip)
 
 
-def update_progress(pos: int, length: int):
-    global progress_bar, progress_text
+def update_progress(pos: int, length: int, text: Optional[str] = None):
+    app = context()
+    progress_bar, progress_text = app.progress_bar, app.progress_text
     if not progress_bar and not progress_text:
         return
     percent = int(100 * pos / length)
     assert progress_bar is not None
     assert progress_text is not None
     progress_bar.UpdateBar(percent)
-    progress_text.update("{}%".format(percent))
+    progress_text.update(text or "{}%".format(percent))
+
+
+def draw_progress():
+    """Show the latest progress of the running job, called once per frame.
+
+    The phases without a known total only update the text.
+    """
+    app = context()
+    events = app.progress.drain()
+    if not events or not app.progress_text:
+        return
+    event = events[-1]
+    percent = event.percent()
+    if percent is None:
+        app.progress_text.update(str(event))
+    else:
+        update_progress(percent, 100, str(event))
 
 
 def disable_elements(ele: sg.Element, disable: bool):
     ele.update(disabled=disable)
 
 
+def start_job(window: sg.Window, name: str, function: Callable[[], Any]) -> Job:
+    """Run function in the background until it ends or Cancel is pressed.
+
+    The buttons and the courses list are disabled while the job runs, except
+    Cancel, so the job ends with the course it started with. The ended job is
+    sent to the window as the value of a KEY_JOB_DONE event.
+    """
+    app = context()
+    app.job = Job(
+        name, function, lambda job: window.write_event_value(KEY_JOB_DONE, job)
+    )
+    app.progress.reset()
+    update_progress(0, 100)
+    disable_all_buttons(window)
+    disable_elements(window[KEY_COURSES], True)
+    disable_elements(window[KEY_CANCEL], False)
+    app.job.start()
+    return app.job
+
+
+def cancel_job():
+    """Cancel the running job, it stops before its next request to Canvas."""
+    job = context().job
+    if job and job.running():
+        job.cancel()
+
+
+def end_job(window: sg.Window) -> Optional[Job]:
+    """Enable the buttons and courses list again once the job ended, and return it."""
+    app = context()
+    job, app.job = app.job, None
+    draw_progress()
+    disable_elements(window[KEY_CANCEL], True)
+    enable_all_buttons(window)
+    disable_elements(window[KEY_COURSES], False)
+    return job
+
+
 def disable_all_buttons(window: sg.Window):
     for bt in buttons:
         disable_elements(window[bt], True)
@@ -601,8 +699,9 @@ def update_height(element, height):
 def make_window():
     sg.theme("SystemDefault")
 
-    global course_info
-    course_info = Course(course_id, course=settings[course_id])
+    app = context()
+    course_info = Course(app.course_id, course=app.settings[app.course_id])
+    app.course_info = course_info
     course = course_info.get()
     xlsx_checked = course[XLSX]
     member_option = course[KEY_MEMBER_OPTION]
@@ -756,7 +855,7 @@ def make_window():
                         [
                             sg.Text("Course ID", pad=(0, 2), size=10),
                             Combo(
-                                settings[KEY_COURSES],
+                                app.settings[KEY_COURSES],
                                 KEY_COURSES,
                                 default=course_info.get_course_title(),
                             ),
@@ -809,6 +908,7 @@ def make_window():
                 [
                     [
                         Button(KEY_EXECUTE, KEY_EXECUTE),
+                        sg.B(KEY_CANCEL, k=KEY_CANCEL, pad=(3, 2), disabled=True),
                         Button(KEY_CLEAR, KEY_CLEAR),
                         Button(KEY_HELP, KEY_HELP),
                         Button(KEY_EXIT, KEY_EXIT),
@@ -850,7 +950,7 @@ def make_window():
                         sg.Text(
                             "0%",
                             key=KEY_PRO_TEXT,
-                            size=(4, None),
+                            size=(32, None),
                             justification="right",
                         ),
                     ],
@@ -876,7 +976,7 @@ def make_window():
         "Canvas group info",
         layout,
         size=(WINDOW_SIZE_X, WINDOW_SIZE_Y),
-        icon=icon,
+        icon=read_icon(),
         margins=(0, 0),
         resizable=True,
         finalize=True,
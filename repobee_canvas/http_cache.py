@@ -0,0 +1,246 @@
+"""Cache the responses of the Canvas API on disk.
+
+The cache is a transport adapter for the requests session of a Canvas client.
+Responses to GET requests are stored under a key derived from the request URL
+(which includes the base URL and the query) and a hash of the access token, so
+different instances and tokens never share entries.
+
+A fresh entry, younger than the time to live of its endpoint, is returned
+without contacting Canvas. Endpoints whose responses rarely change live
+longer by default; a time to live given to the cache applies to all
+endpoints instead. A stale entry is revalidated with a conditional
+request using its ETag and Last-Modified headers; on "304 Not Modified" the
+stored response is used again. The size of the cache directory is bounded by
+evicting the least recently used entries.
+
+Classes:
+- DiskCache: Size-bounded LRU store of responses in a directory.
+- CachingAdapter: Transport adapter that serves requests from a DiskCache.
+- CacheStats: Hit and miss counts of a CachingAdapter.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Optional
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".entry"
+
+# Default time to live, in seconds, of endpoints whose responses rarely change.
+# Other endpoints default to DEFAULT_TTL. Unused when the adapter is given a
+# time to live.
+ENDPOINT_TTLS = {
+    re.compile(r"/api/v1/courses/\d+$"): 24 * 60 * 60,
+    re.compile(r"/api/v1/users/(self|\d+)(/profile)?$"): 24 * 60 * 60,
+}
+
+# Headers that describe the transfer rather than the stored body.
+TRANSFER_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+@dataclass
+class CacheEntry:
+    """A stored response."""
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float = field(default_factory=time.time)
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def validators(self) -> Dict[str, str]:
+        """Headers for a conditional request revalidating this entry."""
+        stored = CaseInsensitiveDict(self.headers)
+        headers = {}
+        if "ETag" in stored:
+            headers["If-None-Match"] = stored["ETag"]
+        if "Last-Modified" in stored:
+            headers["If-Modified-Since"] = stored["Last-Modified"]
+        return headers
+
+
+@dataclass
+class CacheStats:
+    """Counts of requests served from, revalidated against, or missing in the cache."""
+
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+
+    def __sub__(self, other: "CacheStats") -> "CacheStats":
+        return CacheStats(
+            self.hits - other.hits,
+            self.revalidated - other.revalidated,
+            self.misses - other.misses,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.revalidated} revalidated, "
+            f"{self.misses} misses"
+        )
+
+
+class DiskCache:
+    """Store responses as files in directory, using at most max_size bytes.
+
+    Reading an entry marks it as recently used by updating its modification
+    time. When storing an entry makes the directory exceed max_size, the least
+    recently used entries are removed.
+    """
+
+    def __init__(self, directory: Path | str, max_size: int = DEFAULT_MAX_SIZE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with path.open("rb") as entry_file:
+                meta = json.loads(entry_file.readline())
+                body = entry_file.read()
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return CacheEntry(meta["status"], meta["headers"], body, meta["stored_at"])
+
+    def put(self, key: str, entry: CacheEntry):
+        meta = {
+            "status": entry.status,
+            "headers": entry.headers,
+            "stored_at": entry.stored_at,
+        }
+        data = json.dumps(meta).encode("utf-8") + b"\n" + entry.body
+        path = self._path(key)
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            with self._lock:
+                old_size = path.stat().st_size if path.exists() else 0
+                os.replace(tmp, path)
+                self._size += len(data) - old_size
+                if self._size > self.max_size:
+                    self._evict()
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+
+    def _evict(self):
+        entries = sorted(
+            ((entry.stat(), entry) for entry in self._entries()),
+            key=lambda stat_entry: stat_entry[0].st_mtime,
+        )
+        for stat, entry in entries:
+            if self._size <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            self._size -= stat.st_size
+
+    def _entries(self):
+        return self.directory.glob("*" + ENTRY_SUFFIX)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + ENTRY_SUFFIX)
+
+
+class CachingAdapter(HTTPAdapter):
+    """Serve GET requests from a DiskCache, revalidating stale entries.
+
+    Entries are fresh for ttl seconds, or without ttl, for the default time
+    to live of their endpoint.
+    """
+
+    def __init__(self, cache: DiskCache, ttl: Optional[int] = None, **kwargs):
+        super(CachingAdapter, self).__init__(**kwargs)
+        self.cache = cache
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if request.method != "GET":
+            return super(CachingAdapter, self).send(request, **kwargs)
+
+        key = self.key(request)
+        entry = self.cache.get(key)
+        if entry and entry.age() < self.endpoint_ttl(request):
+            self._count("hits")
+            return self._response(request, entry)
+
+        if entry:
+            request.headers.update(entry.validators())
+
+        response = super(CachingAdapter, self).send(request, **kwargs)
+
+        if entry and response.status_code == 304:
+            self._count("revalidated")
+            entry.stored_at = time.time()
+            self.cache.put(key, entry)
+            return self._response(request, entry)
+
+        self._count("misses")
+        if response.status_code == 200:
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in TRANSFER_HEADERS
+            }
+            self.cache.put(key, CacheEntry(200, headers, response.content))
+        return response
+
+    def key(self, request: PreparedRequest) -> str:
+        token = request.headers.get("Authorization", "")
+        identity = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{request.method} {request.url} {identity}".encode("utf-8")
+        ).hexdigest()
+
+    def endpoint_ttl(self, request: PreparedRequest) -> int:
+        if self.ttl is not None:
+            return self.ttl
+        path = request.path_url.split("?")[0]
+        for pattern, ttl in ENDPOINT_TTLS.items():
+            if pattern.search(path):
+                return ttl
+        return DEFAULT_TTL
+
+    def current_stats(self) -> CacheStats:
+        """Return a copy of the counts so far, which the adapter keeps updating."""
+        with self._stats_lock:
+            return replace(self.stats)
+
+    def _count(self, outcome: str):
+        with self._stats_lock:
+            setattr(self.stats, outcome, getattr(self.stats, outcome) + 1)
+
+    def _response(self, request: PreparedRequest, entry: CacheEntry) -> Response:
+        response = Response()
+        response.status_code = entry.status
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry.body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
@@ -0,0 +1,87 @@
+"""Run commands as background jobs that can be cancelled.
+
+A job runs a command in its own thread, so the GUI stays responsive while
+the command talks to Canvas. Cancelling a job is cooperative: the Canvas
+clients call check_cancelled before each request, which raises
+OperationCancelled in the running command once its job is cancelled. A
+command is thus stopped between two pages or requests, never halfway
+through one.
+
+One job runs at a time. Its cancellation is visible to all threads, so the
+threads a command starts to fetch in parallel stop as well.
+
+Classes:
+- OperationCancelled: Raised in a command whose job was cancelled.
+- Job: A command running in a background thread.
+
+Functions:
+- check_cancelled: Raise OperationCancelled if the running job was cancelled.
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+# The cancel event of the running job, if any.
+_cancel: Optional[threading.Event] = None
+
+
+class OperationCancelled(BaseException):
+    """The job running the command was cancelled.
+
+    Like KeyboardInterrupt, this is not an Exception, so handlers of the
+    errors of a request do not mistake a cancellation for a failure.
+    """
+
+
+def check_cancelled():
+    """Raise OperationCancelled if the running job was cancelled."""
+    cancel = _cancel
+    if cancel is not None and cancel.is_set():
+        raise OperationCancelled()
+
+
+class Job:
+    """The command function, running in a background thread once started.
+
+    When the command ends, on_done is called with the job from the thread
+    of the job. Its result, the error it raised, or whether it was
+    cancelled are then available.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        function: Callable[[], Any],
+        on_done: Callable[["Job"], None],
+    ):
+        self.name = name
+        self.function = function
+        self.on_done = on_done
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.cancelled = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        """Ask the command to stop before its next request."""
+        self._cancel.set()
+
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run(self):
+        global _cancel
+        _cancel = self._cancel
+        try:
+            self.result = self.function()
+        except OperationCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            _cancel = None
+        self.on_done(self)
@@ -0,0 +1,56 @@
+"""The keys of the settings and GUI elements of canvas-info.
+
+The keys are shared by the GUI and the CLI, so they are kept apart from the
+GUI code: the CLI uses them without loading the GUI toolkit.
+"""
+
+KEY_ACCESS_TOKEN = "canvas_access_token"
+KEY_BASE_URL = "canvas_base_url"
+KEY_COURSE_ID = "canvas_course_id"
+KEY_STU_FILE = "students_file"
+KEY_CSV_INFO_FILE = "stu_csv_info_file"
+KEY_XLSX_INFO_FILE = "stu_xlsx_info_file"
+KEY_TEAMMATES_INFO_FILE = "stu_teammates_info_file"
+KEY_INFO_FILE_FOLDER = "info_file_folder"
+KEY_INFO_FILE_FOLDER_FB = "info_file_folder_fb"  # folder browse
+KEY_STU_FILE_FOLDER = "students_file_folder"
+KEY_ML = "-ML-"
+KEY_PRO_BAR = "progressbar"
+KEY_PRO_TEXT = "progress"
+KEY_MEMBER_OPTION = "member_option"
+KEY_GIT_ID = "git_id"
+KEY_EMAIL = "email"
+KEY_MEM_BOTH = "(email, gitid)"
+KEY_FULL_GROUPS = "full_groups"
+KEY_REPO_NAME_OPTION = "repo_name_options"
+KEY_INC_GROUP = "include_group"
+KEY_INC_MEMBER = "include_member"
+KEY_INC_INITIAL = "include_initials"
+KEY_COL_PERCENT = "col_percent"
+KEY_HELP = "Help"
+KEY_EXECUTE = "Execute"
+KEY_EXIT = "Exit"
+KEY_CANCEL = "Cancel"
+KEY_JOB_DONE = "job_done"
+KEY_CLEAR = "Clear"
+KEY_CONFIG_COL = "config_column"
+KEY_VERIFY = "Verify"
+KEY_COURSE_NAME = "course_name"
+KEY_COURSES = "courses"
+KEY_DELETE_COURSE = "delete_course"
+KEY_CLONE_COURSE = "clone_course"
+KEY_NEW_COURSE = "new_course"
+KEY_END = "end"
+KEY_TUE = "TUE"
+KEY_CUSTOM = "Custom"
+KEY_URL_OPTION = "url_option"
+KEY_URL_OPTIONS = "url_options"
+KEY_EDIT_TOKEN = "token_bt"
+KEY_EDIT_URL = "url_bt"
+
+# The output files, also the keys of their settings.
+CSV = "csv"
+YAML = "yaml"
+XLSX = "xlsx"
+TEAMMATES = "teammates"
+
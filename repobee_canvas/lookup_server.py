@@ -0,0 +1,194 @@
+"""Answer Canvas-Git lookups over a local HTTP server or Unix socket.
+
+The server keeps the Canvas-Git map of a students info CSV file in memory,
+with all its indexes built, so a lookup does not parse the file again. When
+the file is replaced, for example by the watch action, the map is loaded
+again and swapped in at once; requests that are being answered keep using
+the map they started with.
+
+All responses are JSON. A student is an object with the columns of the
+table as keys.
+
+- GET /students?email=...     The students with the given email addresses.
+  Also by git_id and login_id; repeat parameters to look up several
+  students in one request. The students are listed in the order of the
+  parameters, unknown students are null.
+- GET /groups/<name>          The students in the group.
+- GET /teams                  Each group with its students, by group name.
+- GET /health                 The loaded file and its number of students.
+
+Classes:
+- RosterSource: The Canvas-Git map of a file, reloaded when the file changes.
+
+Functions:
+- make_server: Create the HTTP server answering lookups.
+"""
+
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from .agent import UNIX_SOCKETS
+from .canvas_git_map import Table
+from .columns import COLUMNS, EMAIL, GIT_ID, GROUP, ID
+from .common import inform
+from .defaults import DEFAULT_HOST, DEFAULT_PORT
+from .records import printable
+
+# The query parameters of /students and the columns they look up.
+LOOKUP_PARAMETERS = {
+    "email": EMAIL,
+    "git_id": GIT_ID,
+    "login_id": ID,
+}
+
+
+class RosterSource:
+    """The Canvas-Git map of the CSV file at path, reloaded when it changes.
+
+    The file is checked at most every check_interval seconds. Output files
+    are replaced atomically, so a change is seen as a new file identity.
+    """
+
+    def __init__(self, path: Path | str, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._identity = None
+        self._table = Table([])
+        self.loaded_at = None
+        self.reload()
+
+    def table(self) -> Table:
+        """Return the current map, reloading it first if the file changed."""
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+        return self._table
+
+    def reload(self):
+        """Load the file again if its identity changed since the last load."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            identity = file_identity(self.path)
+            if identity is None or identity == self._identity:
+                return
+
+            table = Table.load(self.path)
+            table.build_indexes()
+            self._table = table
+            self._identity = identity
+            self.loaded_at = time.time()
+            inform(f"Loaded {len(table)} students from {self.path}.")
+
+
+def file_identity(path: Path) -> Optional[Tuple[int, int, int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def student(row: Optional[dict]) -> Optional[dict]:
+    """Convert a row to a student object in a response."""
+    if row is None:
+        return None
+    return dict(zip(COLUMNS, printable(row)))
+
+
+def teams(table: Table) -> Dict[str, List[dict]]:
+    """Map the name of each group to its students, ordered by name."""
+    names = sorted({row[GROUP].name for row in table.rows() if row[GROUP]})
+    return {
+        name: [student(row) for row in table.members(name)] for name in names
+    }
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    """Answer the lookups of the module docstring from server.roster."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        table = self.server.roster.table()
+
+        if parts == ["students"]:
+            lookups = [
+                (LOOKUP_PARAMETERS[parameter], value)
+                for parameter, value in parse_qsl(url.query)
+                if parameter in LOOKUP_PARAMETERS
+            ]
+            if not lookups:
+                return self.reply(400, {"error": "No student to look up."})
+            self.reply(
+                200,
+                [student(table.find(column, value)) for column, value in lookups],
+            )
+        elif len(parts) == 2 and parts[0] == "groups":
+            self.reply(200, [student(row) for row in table.members(parts[1])])
+        elif parts == ["teams"]:
+            self.reply(200, teams(table))
+        elif parts == ["health"]:
+            roster = self.server.roster
+            self.reply(
+                200,
+                {
+                    "file": str(roster.path),
+                    "students": len(table),
+                    "loaded_at": roster.loaded_at,
+                },
+            )
+        else:
+            self.reply(404, {"error": f"Unknown path: {url.path}"})
+
+    def reply(self, status: int, content):
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args):
+        pass
+
+
+if UNIX_SOCKETS:
+
+    class UnixLookupServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def make_server(
+    roster: RosterSource,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """Create a server answering lookups in roster.
+
+    The server listens on the Unix socket at socket_path if given, and on
+    host and port otherwise. Raise ValueError for a socket_path on a
+    platform without Unix sockets.
+    """
+    if socket_path:
+        if not UNIX_SOCKETS:
+            raise ValueError("Unix sockets are not supported on this platform.")
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixLookupServer(socket_path, LookupHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), LookupHandler)
+    server.roster = roster
+    return server
@@ -0,0 +1,153 @@
+"""Report the progress of a command as coalesced events.
+
+A command reports how many items of a phase it has done, from whichever
+thread does the work. A ProgressStream turns the reports into events with the
+rate of the phase and the estimated time left, and keeps only the latest
+event of each phase until it is drained. A display drains the stream at its
+own pace, so thousands of reports cost it one update per frame.
+
+Classes:
+- ProgressEvent: The progress of a phase at one moment.
+- ProgressStream: The latest progress event of each phase, drained by a display.
+- ProgressLine: Show the progress on a single line of the terminal.
+"""
+
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, TextIO
+
+# The phases of fetching the roster of a course.
+USERS = "users"
+GROUPS = "groups"
+ENROLLMENTS = "enrollments"
+PROFILES = "profiles"
+
+# Seconds between two updates of a ProgressLine.
+LINE_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """The progress of phase: done of total items, total None if unknown.
+
+    The rate is in items per second since the phase started, and the ETA in
+    seconds is only known when the total is.
+    """
+
+    phase: str
+    done: int
+    total: Optional[int]
+    rate: float
+    eta: Optional[float]
+
+    def percent(self) -> Optional[int]:
+        if not self.total:
+            return None
+        return int(100 * self.done / self.total)
+
+    def __str__(self) -> str:
+        count = f"{self.done}/{self.total}" if self.total else str(self.done)
+        text = f"{self.phase} {count} {self.rate:.0f}/s"
+        if self.eta is not None:
+            text += f" ETA {self.eta:.0f}s"
+        return text
+
+
+class ProgressStream:
+    """Turn reports of the phases of a command into events, one per phase.
+
+    Reports can come from any thread. drain returns the latest event of
+    each phase reported since the previous drain, in the order the phases
+    were last reported.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._started: Dict[str, float] = {}
+        self._pending: Dict[str, ProgressEvent] = {}
+
+    def report(self, phase: str, done: int, total: Optional[int] = None):
+        """Report that done of total items of phase are done."""
+        now = self.clock()
+        with self._lock:
+            started = self._started.setdefault(phase, now)
+            elapsed = now - started
+            rate = done / elapsed if elapsed > 0 else 0.0
+            eta = None
+            if total is not None and rate > 0:
+                eta = max(total - done, 0) / rate
+            # Reinserted, so the phase moves to the end of the order.
+            self._pending.pop(phase, None)
+            self._pending[phase] = ProgressEvent(phase, done, total, rate, eta)
+
+    def drain(self) -> List[ProgressEvent]:
+        """Return and forget the events reported since the previous drain."""
+        with self._lock:
+            events = list(self._pending.values())
+            self._pending.clear()
+        return events
+
+    def reset(self):
+        """Forget all phases, for the next command."""
+        with self._lock:
+            self._started.clear()
+            self._pending.clear()
+
+
+class ProgressLine:
+    """Show the latest event of a stream on one line of output, until stopped.
+
+    The line is redrawn every interval seconds by a background thread, and
+    cleared when the line is stopped. Messages shown with message appear
+    above the line instead of being mixed with it.
+    """
+
+    def __init__(
+        self,
+        stream: ProgressStream,
+        output: TextIO = sys.stderr,
+        interval: float = LINE_INTERVAL,
+    ):
+        self.stream = stream
+        self.output = output
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._lock = threading.Lock()
+        self._text = ""
+        self._width = 0
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        with self._lock:
+            self._draw("")
+
+    def message(self, text: str):
+        """Print text on its own line, then show the progress below it again."""
+        with self._lock:
+            self._draw("")
+            print(text, flush=True)
+            self._draw(self._text)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            events = self.stream.drain()
+            if events:
+                with self._lock:
+                    self._text = str(events[-1])
+                    self._draw(self._text)
+
+    def _draw(self, text: str):
+        if not text and not self._width:
+            return
+        # Pad with spaces to overwrite a longer previous line.
+        self.output.write("\r" + text.ljust(self._width) + ("" if text else "\r"))
+        self.output.flush()
+        self._width = len(text)
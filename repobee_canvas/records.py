@@ -0,0 +1,131 @@
+"""Compact records of the rows and groups of a Canvas-Git map.
+
+A course can have tens of thousands of students, so the rows of a Canvas-Git
+map do not keep the dicts and canvasapi objects they were created from. A row
+stores its values in slots and a group is reduced to the four fields used by
+the output files; all rows of a group share one GroupRef and group names are
+interned.
+
+Classes:
+- GroupRef: The fields of a Canvas group used in a Canvas-Git map.
+- Row: A row of a Canvas-Git map, accessed like a dict by column name.
+
+Functions:
+- group_ref: Reduce a Canvas group to a GroupRef.
+- printable: Return the values of a row, ready to write.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, NamedTuple, Optional
+
+from .columns import COLUMNS, EMAIL, FULL_NAME, GIT_ID, GROUP, ID, NAME
+
+# The slot holding the value of each column.
+SLOTS = {
+    GROUP: "group",
+    NAME: "name",
+    FULL_NAME: "full_name",
+    ID: "login_id",
+    GIT_ID: "git_id",
+    EMAIL: "email",
+}
+
+
+class GroupRef(NamedTuple):
+    """The fields of a Canvas group used in a Canvas-Git map."""
+
+    id: int
+    name: str
+    members_count: int
+    max_membership: Optional[int]
+
+
+def group_ref(group: Any) -> GroupRef:
+    """Reduce a Canvas group, or any object with the same fields, to a GroupRef."""
+    return GroupRef(
+        group.id,
+        sys.intern(str(group.name)),
+        group.members_count,
+        getattr(group, "max_membership", None),
+    )
+
+
+class Row(Mapping):
+    """A row of a Canvas-Git map, mapping the column names to the values.
+
+    The Canvas user ID of the student is kept alongside the columns, but is
+    not one of them. The printable values of the row are cached once they are
+    computed, and reset when a column is set by name.
+    """
+
+    __slots__ = ("group", "name", "full_name", "login_id", "git_id", "email",
+                 "user_id", "printable")
+
+    def __init__(
+        self,
+        group: GroupRef | str = "",
+        name: str = "",
+        full_name: str = "",
+        login_id: Any = "",
+        git_id: Any = "",
+        email: str = "",
+        user_id: Optional[int] = None,
+    ):
+        self.group = group
+        self.name = name
+        self.full_name = full_name
+        self.login_id = login_id
+        self.git_id = git_id
+        self.email = email
+        self.user_id = user_id
+        self.printable = None
+
+    def __getitem__(self, column: str) -> Any:
+        try:
+            return getattr(self, SLOTS[column])
+        except KeyError:
+            raise KeyError(column) from None
+
+    def __setitem__(self, column: str, value: Any):
+        try:
+            setattr(self, SLOTS[column], value)
+        except KeyError:
+            raise KeyError(column) from None
+        self.printable = None
+
+    def __iter__(self):
+        return iter(COLUMNS)
+
+    def __len__(self) -> int:
+        return len(COLUMNS)
+
+    def copy(self) -> dict:
+        """Return the columns of this row as a dict."""
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"Row({dict(self)!r})"
+
+
+def printable(row: Mapping) -> tuple:
+    """Return the values of row in the order of its columns, ready to write.
+
+    The group of the row is replaced by its name. The values of a Row are
+    computed once and shared by all writers of the row.
+    """
+    if isinstance(row, Row):
+        if row.printable is None:
+            row.printable = (
+                row.group.name if row.group else "",
+                row.name,
+                row.full_name,
+                row.login_id,
+                row.git_id,
+                row.email,
+            )
+        return row.printable
+    return tuple(
+        getattr(value, "name", value) if column == GROUP else value
+        for column, value in row.items()
+    )
@@ -0,0 +1,161 @@
+"""Read and store the settings of canvas-info without the GUI toolkit.
+
+The settings are a JSON file in the folder of PySimpleGUI's user settings,
+which depends on the platform. The CLI only reads them, so it reads the file
+directly instead of loading PySimpleGUI and tkinter.
+
+The GUI changes its settings on every edit. A SettingsStore keeps them in
+memory and writes the file once a burst of edits is over, replacing it
+atomically so it is never left half written. The store keeps its own copy of
+each value, so the GUI can change a value it set or got while the file is
+being written.
+
+Classes:
+- SettingsStore: Settings kept in memory, written to their file in batches.
+
+Functions:
+- settings_folder: The folder of the settings files.
+- read_settings: Read a settings file.
+"""
+
+import atexit
+import json
+import os
+import sys
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_SETTINGS_FILE = "canvas_info.json"
+
+# Seconds without changes after which a SettingsStore writes its file.
+FLUSH_DELAY = 0.5
+
+# The folders PySimpleGUI stores user settings in, by platform prefix.
+SETTINGS_FOLDERS = {
+    "win": r"~\AppData\Local\PySimpleGUI\settings",
+    "linux": "~/.config/PySimpleGUI/settings",
+    "darwin": "~/Library/Application Support/PySimpleGUI/settings",
+}
+
+
+# The stores with changes to write when the program exits. Weak, so a store
+# that is no longer used does not live until then.
+_stores: "weakref.WeakSet[SettingsStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_stores():
+    for store in list(_stores):
+        store.flush()
+
+
+def settings_folder() -> Path:
+    """Return the folder PySimpleGUI stores user settings in on this platform."""
+    for platform, folder in SETTINGS_FOLDERS.items():
+        if sys.platform.startswith(platform):
+            break
+    else:
+        folder = SETTINGS_FOLDERS["darwin"]
+    return Path(os.path.expanduser(folder))
+
+
+def read_settings(filename: str = DEFAULT_SETTINGS_FILE) -> dict:
+    """Read the settings file with filename in the settings folder.
+
+    Return no settings if the file does not exist or is not valid JSON, like
+    PySimpleGUI does.
+    """
+    return read_file(settings_folder() / filename)
+
+
+def read_file(path: Path) -> dict:
+    try:
+        with path.open(encoding="utf-8") as file:
+            settings = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
+
+
+class SettingsStore:
+    """The settings in the file at path, written back in batches.
+
+    A change is kept in memory and the file is written flush_delay seconds
+    after the last change, so one write covers a burst of changes. Changes
+    that are not written yet are written when the program exits. Like
+    PySimpleGUI's user settings, a missing setting is None.
+    """
+
+    def __init__(self, path: Path | str, flush_delay: float = FLUSH_DELAY):
+        self.path = Path(path)
+        self.flush_delay = flush_delay
+        self._settings = read_file(self.path)
+        self._lock = threading.Lock()
+        self._writing = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        _stores.add(self)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.get(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return snapshot(self._settings.get(key, default))
+
+    def set(self, key: str, value: Any):
+        """Set key to a copy of value, writing the file once the changes stop."""
+        value = snapshot(value)
+        with self._lock:
+            self._settings[key] = value
+            self._changed()
+
+    def delete(self, key: str):
+        """Remove key, writing the file once the changes stop."""
+        with self._lock:
+            if self._settings.pop(key, None) is not None:
+                self._changed()
+
+    def _changed(self):
+        self._dirty = True
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Write the changed settings to the file now, replacing it atomically."""
+        # Writes are serialized, so an older content never replaces a newer one.
+        with self._writing:
+            with self._lock:
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                content = json.dumps(self._settings)
+                self._dirty = False
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # The file is only readable by the user, it contains access tokens.
+            fd, name = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as file:
+                    file.write(content)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(name, self.path)
+            except BaseException:
+                os.unlink(name)
+                raise
+
+
+def snapshot(value: Any) -> Any:
+    """Return a deep copy of the JSON value, as it would be read from the file."""
+    return json.loads(json.dumps(value))
@@ -0,0 +1,175 @@
+"""Store the rosters fetched from Canvas in a local SQLite database.
+
+Each fetch of a course roster is stored with its timestamp, its rows and its
+groups, so the next run can tell which students changed since then, and the
+output files can be regenerated without contacting Canvas. Only the most
+recent fetches of a course are kept.
+
+Classes:
+- StoredStudent: A student as stored in a snapshot.
+- StoredGroup: A group as stored in a snapshot.
+- Snapshot: A fetch of a course roster.
+- SnapshotStore: The database of roster snapshots.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from .defaults import DEFAULT_SNAPSHOT_DB
+
+KEEP_FETCHES = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetches (
+    fetch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS students (
+    fetch_id INTEGER NOT NULL REFERENCES fetches ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    stamp TEXT,
+    group_id INTEGER,
+    name,
+    full_name,
+    login_id,
+    git_id,
+    email,
+    PRIMARY KEY (fetch_id, position)
+);
+CREATE TABLE IF NOT EXISTS groups (
+    fetch_id INTEGER NOT NULL REFERENCES fetches ON DELETE CASCADE,
+    group_id INTEGER NOT NULL,
+    name TEXT,
+    members_count INTEGER,
+    max_membership INTEGER,
+    PRIMARY KEY (fetch_id, group_id)
+);
+CREATE INDEX IF NOT EXISTS fetches_by_course ON fetches (course_id, fetched_at);
+"""
+
+
+class StoredStudent(NamedTuple):
+    """A student as stored in a snapshot.
+
+    The stamp summarizes the enrollment and group membership of the student
+    at the time of the fetch.
+    """
+
+    user_id: int
+    stamp: str
+    group_id: Optional[int]
+    name: str
+    full_name: str
+    login_id: Any
+    git_id: Any
+    email: str
+
+
+class StoredGroup(NamedTuple):
+    """A group as stored in a snapshot, with its size at the time of the fetch."""
+
+    id: int
+    name: str
+    members_count: int
+    max_membership: Optional[int]
+
+
+class Snapshot(NamedTuple):
+    """A fetch of a course roster, students in the order of the roster."""
+
+    fetch_id: int
+    fetched_at: float
+    students: List[StoredStudent]
+    groups: Dict[int, StoredGroup]
+
+
+class SnapshotStore:
+    """Snapshots of course rosters in the SQLite database at path."""
+
+    def __init__(self, path: Path | str = DEFAULT_SNAPSHOT_DB):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path))
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(SCHEMA)
+
+    def latest_fetch(self, course_id: int) -> Optional[int]:
+        """Return the ID of the latest fetch of the course, if any."""
+        row = self._db.execute(
+            "SELECT fetch_id FROM fetches WHERE course_id = ? "
+            "ORDER BY fetched_at DESC, fetch_id DESC LIMIT 1",
+            (course_id,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def latest(self, course_id: int) -> Optional[Snapshot]:
+        """Return the latest snapshot of the course, if any."""
+        fetch_id = self.latest_fetch(course_id)
+        if fetch_id is None:
+            return None
+
+        (fetched_at,) = self._db.execute(
+            "SELECT fetched_at FROM fetches WHERE fetch_id = ?", (fetch_id,)
+        ).fetchone()
+        students = self._db.execute(
+            "SELECT user_id, stamp, group_id, name, full_name, login_id, git_id, "
+            "email FROM students WHERE fetch_id = ? ORDER BY position",
+            (fetch_id,),
+        )
+        groups = self._db.execute(
+            "SELECT group_id, name, members_count, max_membership FROM groups "
+            "WHERE fetch_id = ?",
+            (fetch_id,),
+        )
+        return Snapshot(
+            fetch_id,
+            fetched_at,
+            [StoredStudent(*row) for row in students],
+            {row[0]: StoredGroup(*row) for row in groups},
+        )
+
+    def students(self, course_id: int) -> Dict[int, StoredStudent]:
+        """Map the user ID of each student in the latest fetch to the student."""
+        snapshot = self.latest(course_id)
+        if snapshot is None:
+            return {}
+        return {student.user_id: student for student in snapshot.students}
+
+    def save(
+        self,
+        course_id: int,
+        students: Iterable[StoredStudent],
+        groups: Iterable[StoredGroup] = (),
+    ) -> int:
+        """Store a fetch of the course with students and groups, return its ID."""
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO fetches (course_id, fetched_at) VALUES (?, ?)",
+                (course_id, time.time()),
+            )
+            fetch_id = cursor.lastrowid
+            self._db.executemany(
+                "INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (fetch_id, position, *student)
+                    for position, student in enumerate(students)
+                ),
+            )
+            self._db.executemany(
+                "INSERT INTO groups VALUES (?, ?, ?, ?, ?)",
+                ((fetch_id, *group) for group in groups),
+            )
+            self._db.execute(
+                "DELETE FROM fetches WHERE course_id = ? AND fetch_id NOT IN "
+                "(SELECT fetch_id FROM fetches WHERE course_id = ? "
+                "ORDER BY fetched_at DESC, fetch_id DESC LIMIT ?)",
+                (course_id, course_id, KEEP_FETCHES),
+            )
+        return fetch_id
+
+    def close(self):
+        self._db.close()
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from .defaults import DEFAULT_SNAPSHOT_DB
+
 @dataclass
 class Help:
     help: str = """Help message"""
@@ -14,3 +16,20 @@ class Help:
     info_file: str = "Help message for info file"
     yaml_file: str = "Help message for yaml file"
     action: str = "Help message for yaml action"
+    concurrency: str = "Number of profiles fetched from Canvas in parallel"
+    active_only: str = "Only include students whose enrollment is active"
+    cache_dir: str = "Directory in which Canvas responses are cached between runs"
+    cache_ttl: str = "Seconds a cached Canvas response is used before it is revalidated, by default 5 minutes and a day for courses and profiles. The watch action revalidates on every poll"
+    no_cache: str = "Do not use the cache, even when a cache directory is given"
+    snapshot: str = f"Store each fetched roster in {DEFAULT_SNAPSHOT_DB}, only changed students are processed again"
+    snapshot_db: str = "SQLite database in which each fetched roster is stored, instead of the one of --snapshot"
+    from_snapshot: str = "Create the files from the latest snapshot in the snapshot database, without contacting Canvas"
+    full: str = "Process every student again, even if unchanged since the previous snapshot"
+    diff_report: str = "JSON file listing the students added, removed and moved to another group since the existing info file"
+    interval: str = "Seconds between two checks of the course in the watch action"
+    host: str = "Address on which the serve action answers lookups"
+    port: str = "Port on which the serve action answers lookups"
+    socket: str = "Unix socket on which the serve action answers lookups, instead of host and port"
+    no_agent: str = "Run the command in this process, even if the agent is running"
+    progress: str = "Show the progress of fetching the roster on one line of the terminal, when the command is not run by the agent"
+    bulk: str = "Read the student profiles from the roster listings instead of one request per student"
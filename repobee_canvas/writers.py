@@ -0,0 +1,432 @@
+"""Write the rows of a Canvas-Git map to files while they are produced.
+
+A writer opens its file when it receives the first row, so no file is created
+for an empty table, and writes each row as soon as it receives it. A file is
+only replaced, atomically, when its new content differs. All writers
+write the printable values of a row, which are computed once per row.
+
+Classes:
+- RowWriter: Base class of the incremental writers.
+- CsvWriter: Write the rows to a CSV file.
+- ExcelRowWriter: Base class of the Excel writers.
+- ExcelWriter: Write the rows to an Excel file.
+- TeammatesWriter: Write the rows in the format of a Teammates Excel file.
+- RosterDiffWriter: Write the changes since a previous roster as JSON.
+- ExportResult: The outcome of a writer in export_rows.
+
+Functions:
+- write_rows: Pass each row to all writers.
+- replace_if_changed: Atomically replace a file, unless its content is the same.
+- export_rows: Pass each row to all writers, running concurrently.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import xlsxwriter
+
+from .columns import COLUMNS, EMAIL, FIELD_SEP, FULL_NAME, GROUP, ID
+from .records import printable
+
+TEAMMATES_COLUMNS = ["Section", "Team", "Name", "Email", "Comments"]
+
+# Rows waiting for each writer of export_rows.
+QUEUE_SIZE = 1000
+END = object()
+ABORT = object()
+
+HASH_CHUNK = 1024 * 1024
+CREATED = datetime(2000, 1, 1)
+
+# Bounds, in characters, of the fitted width of an Excel column.
+WIDTH_PADDING = 2
+MAX_WIDTH = 60
+
+
+class RowWriter:
+    """Base class of the writers, subclasses implement open, write_row and close.
+
+    Subclasses write to the temporary file output, next to path. Once all
+    rows are written, finish replaces the file at path by the output only if
+    their contents differ, so an unchanged file keeps its modification time.
+    The description names the written file in messages to the user.
+    """
+
+    description = None
+
+    def __init__(self, path: Path | str, columns: List[str] = COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.opened = False
+        self.changed = False
+
+    def write(self, row: dict):
+        """Write row, opening the file first if this is the first row."""
+        if not self.opened:
+            self._pick = picker(list(row.keys()), self.columns)
+            self.output = temporary_file(Path(self.path))
+            self.open()
+            self.opened = True
+        self.write_row(row)
+
+    def finish(self):
+        """Close the output and move it to path if it differs from the file there."""
+        try:
+            self.close()
+        except BaseException:
+            self.output.unlink(missing_ok=True)
+            raise
+        self.changed = replace_if_changed(self.output, Path(self.path))
+
+    def discard(self):
+        """Close and remove the output, leaving the file at path as it was."""
+        try:
+            self.close()
+        finally:
+            self.output.unlink(missing_ok=True)
+
+    def values(self, row: dict) -> tuple:
+        """Return the printable values of the columns of this writer in row."""
+        values = printable(row)
+        if self._pick is None:
+            return values
+        return self._pick(values)
+
+    def open(self):
+        pass
+
+    def write_row(self, row: dict):
+        pass
+
+    def close(self):
+        pass
+
+
+class CsvWriter(RowWriter):
+    """Write the rows to a CSV file.
+
+    The rows go to a temporary file, so the CSV file only shows up, complete,
+    once the last row is written. Rows are buffered instead of flushed one by
+    one, as nobody can read the temporary file while it is written.
+    """
+
+    description = "students info CSV file"
+
+    def open(self):
+        self._file = self.output.open("w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file, delimiter=FIELD_SEP)
+        self._writer.writerow(self.columns)
+
+    def write_row(self, row: dict):
+        self._writer.writerow(self.values(row))
+
+    def close(self):
+        self._file.close()
+
+
+class ExcelRowWriter(RowWriter):
+    """Base class of the Excel writers, streaming one row at a time.
+
+    The workbook is written in xlsxwriter's constant memory mode, so each row
+    is flushed to disk once the next one is written. The width of each column
+    is fitted to its longest value while the rows are written, and the header
+    gets an autofilter spanning all written rows and columns.
+    """
+
+    def header(self) -> List[str]:
+        return self.columns
+
+    def open(self):
+        self._workbook = xlsxwriter.Workbook(
+            str(self.output), {"constant_memory": True}
+        )
+        # A fixed creation time keeps the file the same for the same rows.
+        self._workbook.set_properties({"created": CREATED})
+        self._worksheet = self._workbook.add_worksheet()
+        header = self.header()
+        self._widths = [len(str(title)) for title in header]
+        self._worksheet.write_row(
+            0, 0, header, self._workbook.add_format({"bold": True})
+        )
+        self._rows = 0
+
+    def write_row(self, row: dict):
+        values = self.values(row)
+        self._rows += 1
+        self._worksheet.write_row(self._rows, 0, values)
+        for column, value in enumerate(values):
+            width = len(str(value))
+            if width > self._widths[column]:
+                self._widths[column] = width
+
+    def close(self):
+        for column, width in enumerate(self._widths):
+            self._worksheet.set_column(
+                column, column, min(width + WIDTH_PADDING, MAX_WIDTH)
+            )
+        self._worksheet.autofilter(0, 0, self._rows, len(self._widths) - 1)
+        self._workbook.close()
+
+
+class ExcelWriter(ExcelRowWriter):
+    """Write the rows to an Excel file."""
+
+    description = "students info Excel file"
+
+
+class TeammatesWriter(ExcelRowWriter):
+    """Write the rows in the format of a Teammates Excel file."""
+
+    description = "students info Teammates Excel file"
+
+    def __init__(self, path: Path | str):
+        super(TeammatesWriter, self).__init__(path, [GROUP, FULL_NAME, EMAIL, ID])
+
+    def header(self) -> List[str]:
+        return TEAMMATES_COLUMNS
+
+    def values(self, row: dict) -> list:
+        return teammates_values(*super(TeammatesWriter, self).values(row))
+
+
+class RosterDiffWriter(RowWriter):
+    """Write the differences between a previous roster and the rows as JSON.
+
+    The report lists the students that were added, the students that were
+    removed, and the students that moved to another group. Students are
+    identified by their email address.
+    """
+
+    description = "roster diff report"
+
+    def __init__(self, path: Path | str, previous: Iterable[dict]):
+        super(RosterDiffWriter, self).__init__(path)
+        self.previous = previous
+
+    def open(self):
+        self._students = {}
+
+    def write_row(self, row: dict):
+        student = dict(zip(self.columns, self.values(row)))
+        self._students[student_key(student)] = student
+
+    def close(self):
+        if self._students is None:
+            return
+        with self.output.open("w", encoding="utf-8") as report:
+            json.dump(roster_diff(self.previous, self._students), report, indent=2)
+        self._students = None
+
+
+def roster_diff(previous: Iterable[dict], students: Dict[str, dict]) -> dict:
+    """Compare the previous rows with the students, keyed by student_key."""
+    before = {}
+    for row in previous:
+        student = dict(zip(COLUMNS, row_values(row, COLUMNS)))
+        before[student_key(student)] = student
+
+    moved = [
+        {"student": student, "from": before[key][GROUP], "to": student[GROUP]}
+        for key, student in students.items()
+        if key in before and str(before[key][GROUP]) != str(student[GROUP])
+    ]
+    return {
+        "added": [
+            student for key, student in students.items() if key not in before
+        ],
+        "removed": [
+            student for key, student in before.items() if key not in students
+        ],
+        "moved": moved,
+    }
+
+
+def student_key(student: dict) -> str:
+    return str(student[EMAIL] or student[ID]).strip().lower()
+
+
+def teammates_row(row: dict) -> list:
+    """Convert a row to the columns of a Teammates file."""
+    return teammates_values(*row_values(row, [GROUP, FULL_NAME, EMAIL, ID]))
+
+
+def teammates_values(group: str, full_name: str, email: str, login_id) -> list:
+    """Arrange the printable values of a student as the columns of a Teammates file."""
+    section = ""
+    if group != "":
+        section = int(int(group) / 100)
+    return [section, group, full_name, email, login_id]
+
+
+def row_values(row: dict, columns: List[str]) -> tuple:
+    """Return the printable values of columns in row."""
+    pick = picker(list(row.keys()), columns)
+    return pick(printable(row)) if pick else printable(row)
+
+
+def picker(keys: List[str], columns: List[str]) -> Optional[Callable]:
+    """Return a function picking the values of columns from the values of keys.
+
+    Return None if no picking is needed because keys and columns are equal.
+    """
+    if keys == columns:
+        return None
+    pick = itemgetter(*(keys.index(column) for column in columns))
+    if len(columns) == 1:
+        return lambda values: (pick(values),)
+    return pick
+
+
+def write_rows(rows: Iterable[dict], writers: List[RowWriter]) -> int:
+    """Pass each row to all writers, then finish them.
+
+    Return the number of rows written. If generating the rows fails, the
+    writers discard their output and the files are left as they were.
+    """
+    count = 0
+    try:
+        for row in rows:
+            for writer in writers:
+                writer.write(row)
+            count += 1
+    except BaseException:
+        for writer in writers:
+            if writer.opened:
+                writer.discard()
+        raise
+
+    for writer in writers:
+        if writer.opened:
+            writer.finish()
+    return count
+
+
+def temporary_file(path: Path) -> Path:
+    """Create an empty file next to path to write its new content to."""
+    fd, name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    # Give the file the permissions of a file created by open.
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(name, 0o666 & ~umask)
+    return Path(name)
+
+
+def replace_if_changed(output: Path, path: Path) -> bool:
+    """Move output to path, unless path has the same content already.
+
+    Return whether path was replaced; otherwise output is removed.
+    """
+    try:
+        same = (
+            path.stat().st_size == output.stat().st_size
+            and file_hash(path) == file_hash(output)
+        )
+    except OSError:
+        same = False
+
+    if same:
+        output.unlink()
+    else:
+        os.replace(output, path)
+    return not same
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as content:
+        for chunk in iter(lambda: content.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class ExportResult:
+    """The outcome of a writer in export_rows.
+
+    The duration is the time the writer spent writing and closing its file.
+    """
+
+    writer: RowWriter
+    count: int = 0
+    duration: float = 0.0
+    error: Optional[BaseException] = None
+
+    def size(self) -> Optional[int]:
+        """Return the size in bytes of the written file, if it exists."""
+        try:
+            return Path(self.writer.path).stat().st_size
+        except OSError:
+            return None
+
+
+def export_rows(rows: Iterable[dict], writers: List[RowWriter]) -> List[ExportResult]:
+    """Pass each row to all writers, each writer running in its own thread.
+
+    Each writer has a queue of at most QUEUE_SIZE rows, so a slow writer
+    delays the rows but no writer holds up the others for longer. An error
+    in a writer stops only that writer; it is recorded in the writer's
+    result and the writer's file is left as it was. Errors while generating
+    the rows are raised once all writers have discarded their output.
+    """
+    results = [ExportResult(writer) for writer in writers]
+    queues = [queue.Queue(QUEUE_SIZE) for _ in writers]
+    threads = [
+        threading.Thread(target=_export, args=(result, rows_queue), daemon=True)
+        for result, rows_queue in zip(results, queues)
+    ]
+    for thread in threads:
+        thread.start()
+
+    end = ABORT
+    try:
+        for row in rows:
+            for result, rows_queue in zip(results, queues):
+                if result.error is None:
+                    rows_queue.put(row)
+        end = END
+    finally:
+        for rows_queue in queues:
+            rows_queue.put(end)
+        for thread in threads:
+            thread.join()
+    return results
+
+
+def _export(result: ExportResult, rows_queue: queue.Queue):
+    writer = result.writer
+    row = rows_queue.get()
+    while row is not END and row is not ABORT:
+        if result.error is None:
+            start = time.perf_counter()
+            try:
+                writer.write(row)
+                result.count += 1
+            except Exception as e:
+                result.error = e
+            result.duration += time.perf_counter() - start
+        row = rows_queue.get()
+
+    if writer.opened:
+        start = time.perf_counter()
+        try:
+            if row is ABORT or result.error:
+                writer.discard()
+            else:
+                writer.finish()
+        except Exception as e:
+            result.error = result.error or e
+        result.duration += time.perf_counter() - start
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from repobee_canvas import agent, common
+from repobee_canvas.agent import AgentServer, AgentUnavailable, forward
+
+
+def test_forward_runs_command_in_agent(tmp_path, monkeypatch):
+    calls = []
+
+    def info(student_csv_info_file=None, concurrency=8):
+        calls.append((student_csv_info_file, concurrency))
+        # Messages of worker threads reach the client too.
+        worker = threading.Thread(target=common.inform, args=("From a worker.",))
+        worker.start()
+        worker.join()
+        common.warn("Almost done.")
+
+    def verify():
+        raise ValueError("No such course.")
+
+    socket_path = tmp_path / "agent.sock"
+    server = AgentServer(socket_path, {"info": info, "verify": verify})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    messages = []
+    monkeypatch.setattr("builtins.print", messages.append)
+    monkeypatch.chdir(tmp_path)
+    try:
+        forward("info", {"student_csv_info_file": "a.csv", "concurrency": 4}, socket_path)
+        assert calls == [(str(tmp_path / "a.csv"), 4)]
+        assert messages == ["From a worker.", "WARNING: Almost done."]
+        assert socket_path.stat().st_mode & 0o077 == 0
+
+        with pytest.raises(RuntimeError, match="No such course."):
+            forward("verify", {}, socket_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with pytest.raises(AgentUnavailable):
+        forward("info", {}, socket_path)
+
+
+def test_forward_without_unix_sockets(monkeypatch):
+    monkeypatch.setattr(agent, "UNIX_SOCKETS", False)
+    with pytest.raises(AgentUnavailable):
+        forward("verify", {})
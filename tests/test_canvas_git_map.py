@@ -0,0 +1,269 @@
+import random
+import time
+from types import SimpleNamespace
+
+from repobee_canvas import canvas_git_map
+from repobee_canvas.canvas_git_map import (
+    CANVAS_ID,
+    EMAIL,
+    GIT_ID,
+    GROUP,
+    ID,
+    canvas_git_map_table_wizard,
+    fetch_profiles,
+    roster_fingerprint,
+    snapshot_table,
+    Table,
+)
+from repobee_canvas.snapshot import SnapshotStore
+
+
+class FakeStudent:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.short_name = f"Student {user_id}"
+
+    def get_profile(self):
+        time.sleep(random.random() / 100)
+        return {
+            "primary_email": f"s.student{self.id}@student.tue.nl",
+            "login_id": str(self.id),
+        }
+
+
+class FakeList(list):
+    def _is_larger_than(self, n):
+        return len(self) > n
+
+
+class FakeGroup:
+    def __init__(self, group_id, user_ids):
+        self.id = group_id
+        self.name = str(group_id)
+        self.members_count = len(user_ids)
+        self.max_membership = 2
+        self.user_ids = user_ids
+
+    def get_memberships(self, **kwargs):
+        return FakeList(SimpleNamespace(user_id=i) for i in self.user_ids)
+
+
+class FakeCourse:
+    id = 34
+    name = "Fake course"
+
+    def __init__(self):
+        self._requester = SimpleNamespace(_session=None)
+        self.users = [FakeStudent(i) for i in range(1, 6)]
+        self.users.append(SimpleNamespace(id=99, short_name="Teacher"))
+        self.groups = [FakeGroup(101, [1, 2]), FakeGroup(102, [3])]
+        self.calls = []
+
+    def get_users(self, **kwargs):
+        self.calls.append(("users", kwargs))
+        return FakeList(self.users)
+
+    def get_groups(self, **kwargs):
+        self.calls.append(("groups", kwargs))
+        return FakeList(self.groups)
+
+    def get_enrollments(self, **kwargs):
+        self.calls.append(("enrollments", kwargs))
+        return FakeList(
+            SimpleNamespace(
+                user_id=user.id,
+                type="TeacherEnrollment" if user.id == 99 else "StudentEnrollment",
+                user={"id": user.id, "sis_user_id": str(1000 + user.id)},
+            )
+            for user in self.users
+            if user.id != 5
+        )
+
+
+def fake_course():
+    return FakeCourse()
+
+
+def test_fetch_profiles_keeps_student_order(monkeypatch):
+    progress = []
+    monkeypatch.setattr(
+        canvas_git_map,
+        "show_progress",
+        lambda phase, done, total=None: progress.append((phase, done, total)),
+    )
+    students = [FakeStudent(i) for i in range(50)]
+
+    profiles = fetch_profiles(students, concurrency=4)
+
+    assert [p["login_id"] for p in profiles] == [str(i) for i in range(50)]
+    assert progress == [("profiles", done, 50) for done in range(1, 51)]
+
+
+def test_student_row_uses_profile_fields():
+    student = FakeStudent(7)
+    row = canvas_git_map.student_row(student, student.get_profile(), {})
+    assert row[ID] == 7
+    assert row[EMAIL] == "s.student7@student.tue.nl"
+
+
+def test_bulk_profile_merges_user_and_enrollment_fields():
+    student = SimpleNamespace(id=3, email="a.b@student.tue.nl", login_id=None)
+    profile = canvas_git_map.bulk_profile(
+        student, {"login_id": "20201234", "sis_user_id": "1234567"}
+    )
+    assert profile == {
+        "primary_email": "a.b@student.tue.nl",
+        "login_id": "20201234",
+        "sis_user_id": "1234567",
+    }
+
+
+def test_wizard_builds_student_rows(monkeypatch):
+    monkeypatch.setattr(canvas_git_map, "show_progress", lambda *args: None)
+    course = fake_course()
+
+    table = canvas_git_map_table_wizard(course, concurrency=2, bulk=False)
+    rows = list(table.rows())
+
+    assert [row[ID] for row in rows] == [1, 2, 3, 4]
+    assert [row[GROUP] and row[GROUP].name for row in rows] == [
+        "101",
+        "101",
+        "102",
+        "",
+    ]
+    assert ("users", {"enrollment_type": ["student"]}) in course.calls
+    assert ("enrollments", {"type": ["StudentEnrollment"]}) in course.calls
+
+
+def test_wizard_bulk_mode_only_fetches_incomplete_profiles(monkeypatch):
+    monkeypatch.setattr(canvas_git_map, "show_progress", lambda *args: None)
+    course = fake_course()
+    course.users[0].email = "x.first@student.tue.nl"
+    course.users[0].login_id = "1"
+    course.users[0].get_profile = None  # must not be called
+
+    rows = list(canvas_git_map_table_wizard(course, bulk=True).rows())
+
+    assert rows[0][EMAIL] == "x.first@student.tue.nl"
+    assert [row[GIT_ID] for row in rows] == [1001, 1002, 1003, 1004]
+
+
+def test_load_group_members_uses_embedded_users():
+    course = fake_course()
+    course.groups[0].users = [{"id": 1}, {"id": 2}]
+    course.groups[0].get_memberships = None  # must not be called
+
+    group_members = canvas_git_map.load_group_members(course, bulk=True)
+
+    assert {user_id: group.id for user_id, group in group_members.items()} == {
+        1: 101,
+        2: 101,
+        3: 102,
+    }
+    assert ("groups", {"include": ["users"], "per_page": 100}) in course.calls
+
+
+def test_wizard_reuses_unchanged_students_of_previous_snapshot(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setattr(canvas_git_map, "show_progress", lambda *args: None)
+    snapshots = SnapshotStore(tmp_path / "snapshots.db")
+    course = fake_course()
+    first = list(
+        canvas_git_map_table_wizard(course, bulk=False, snapshots=snapshots).rows()
+    )
+
+    fetched = []
+    for student in course.users:
+        student.get_profile = lambda student=student: fetched.append(student.id) or {}
+    course.groups[1].user_ids = [4]  # student 4 joins group 102, 3 leaves it
+    second = list(
+        canvas_git_map_table_wizard(course, bulk=False, snapshots=snapshots).rows()
+    )
+
+    assert sorted(fetched) == [3, 4]
+    assert second[:2] == first[:2]
+    assert second[3][GROUP].name == "102"
+
+    fetched.clear()
+    canvas_git_map_table_wizard(course, bulk=False, snapshots=snapshots, full=True)
+    assert sorted(fetched) == [1, 2, 3, 4]
+
+
+def test_snapshot_table_restores_rows_and_groups(monkeypatch, tmp_path):
+    monkeypatch.setattr(canvas_git_map, "show_progress", lambda *args: None)
+    snapshots = SnapshotStore(tmp_path / "snapshots.db")
+    fetched = list(
+        canvas_git_map_table_wizard(
+            fake_course(), bulk=False, snapshots=snapshots
+        ).rows()
+    )
+
+    restored = list(snapshot_table(snapshots.latest(FakeCourse.id)).rows())
+
+    assert [row[ID] for row in restored] == [row[ID] for row in fetched]
+    assert [row[GROUP] and row[GROUP].name for row in restored] == [
+        "101",
+        "101",
+        "102",
+        "",
+    ]
+    assert restored[0][GROUP].members_count == 2
+    assert restored[0][GROUP] is restored[1][GROUP]
+
+
+def test_table_lookups(monkeypatch):
+    monkeypatch.setattr(canvas_git_map, "show_progress", lambda *args: None)
+    table = canvas_git_map_table_wizard(fake_course())
+
+    assert table.find(EMAIL, "S.Student2@student.tue.nl")[ID] == 2
+    assert table.find(GIT_ID, "1003")[EMAIL] == "s.student3@student.tue.nl"
+    assert table.find(ID, 5) is None
+    assert [row and row[ID] for row in table.find_all(CANVAS_ID, [4, 9, 1])] == [
+        4,
+        None,
+        1,
+    ]
+    assert [row[ID] for row in table.members("101")] == [1, 2]
+    assert table.members("103") == []
+    assert table.git_ids([3]) == [1003]
+    assert table.canvas_ids(["1001", 2000]) == [1, None]
+
+
+def test_load_written_table(monkeypatch, tmp_path):
+    monkeypatch.setattr(canvas_git_map, "show_progress", lambda *args: None)
+    path = tmp_path / "student-info.csv"
+    table = canvas_git_map_table_wizard(fake_course())
+    table.write(path)
+
+    loaded = Table.load(path)
+    assert loaded.columns() == table.columns()
+    assert [row[ID] for row in loaded.rows()] == [1, 2, 3, 4]
+    assert [row[GIT_ID] for row in loaded.rows()] == [1001, 1002, 1003, 1004]
+    first, second, third = list(loaded.rows())[:3]
+    assert first[GROUP] is second[GROUP]
+    assert (first[GROUP].name, first[GROUP].members_count) == ("101", 2)
+    assert third[GROUP].members_count == 1
+    assert list(loaded.rows())[3][GROUP] == ""
+    assert loaded.find(GIT_ID, 1003)[EMAIL] == "s.student3@student.tue.nl"
+
+    lazy = Table.load(str(path), lazy=True)
+    assert not lazy.empty()
+    assert [row[EMAIL] for row in lazy.rows()] == [row[EMAIL] for row in loaded.rows()]
+    assert [row[ID] for row in lazy.members("101")] == [1, 2]
+
+
+def test_roster_fingerprint_follows_group_changes():
+    course = fake_course()
+    fingerprint = roster_fingerprint(course)
+    assert roster_fingerprint(course) == fingerprint
+    assert not any(call == "users" for call, _ in course.calls)
+
+    course.groups[0].user_ids = [1]
+    course.groups[1].user_ids = [2, 3]
+    moved = roster_fingerprint(course)
+    assert moved != fingerprint
+
+    course.groups[1].name = "103"
+    assert roster_fingerprint(course) != moved
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+from canvasapi.exceptions import (
+    InvalidAccessToken,
+    ResourceDoesNotExist,
+    Unauthorized,
+)
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from repobee_canvas import common
+from repobee_canvas.client import (
+    ACCESS_TOKEN,
+    BASE_URL,
+    COURSE_ID,
+    CourseLookupError,
+    _session,
+    cache_stats,
+    find_course,
+    make_canvas,
+    report_cache,
+)
+
+
+class FakeCanvas:
+    def __init__(self, course=None, current_user=None, courses=()):
+        self.course = course
+        self.current_user = current_user
+        self.courses = courses
+        self.scanned = False
+
+    def get_course(self, course_id):
+        if isinstance(self.course, Exception):
+            raise self.course
+        return self.course
+
+    def get_current_user(self):
+        if isinstance(self.current_user, Exception):
+            raise self.current_user
+        return self.current_user
+
+    def get_courses(self):
+        self.scanned = True
+        return self.courses
+
+
+def test_find_course_uses_direct_lookup():
+    course = SimpleNamespace(id=34)
+    canvas = FakeCanvas(course=course)
+    assert find_course(canvas, 34) is course
+    assert not canvas.scanned
+
+
+def test_find_course_scans_when_direct_lookup_is_not_allowed():
+    course = SimpleNamespace(id=34)
+    canvas = FakeCanvas(
+        course=Unauthorized("not allowed"),
+        courses=[SimpleNamespace(id=1), course],
+    )
+    assert find_course(canvas, 34) is course
+    assert canvas.scanned
+
+
+@pytest.mark.parametrize(
+    "course, current_user, reason",
+    [
+        (ResourceDoesNotExist("Not Found"), SimpleNamespace(), COURSE_ID),
+        (ResourceDoesNotExist("Not Found"), ResourceDoesNotExist("Not Found"), BASE_URL),
+        (InvalidAccessToken("Invalid access token."), None, ACCESS_TOKEN),
+    ],
+)
+def test_find_course_classifies_errors(course, current_user, reason):
+    canvas = FakeCanvas(course=course, current_user=current_user)
+    with pytest.raises(CourseLookupError) as error:
+        find_course(canvas, 34)
+    assert error.value.reason == reason
+
+
+def test_reused_client_reports_the_cache_of_each_command(tmp_path, monkeypatch):
+    def send(adapter, request, **kwargs):
+        response = Response()
+        response.status_code = 200
+        response._content = b"[]"
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", send)
+    messages = []
+    previous = common.redirect(messages.append)
+    try:
+        url = "https://canvas.example.com/api/v1/courses"
+        for command in range(2):
+            canvas = make_canvas("https://canvas.example.com", "token", tmp_path)
+            started = cache_stats(canvas)
+            _session(canvas).get(url + f"?page={command}")
+            _session(canvas).get(url + f"?page={command}")
+            report_cache(canvas, started)
+    finally:
+        common.redirect(previous)
+
+    assert messages == ["Cache: 1 hits, 0 revalidated, 1 misses"] * 2
+    assert str(cache_stats(canvas)) == "2 hits, 0 revalidated, 2 misses"
@@ -0,0 +1,104 @@
+import os
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from repobee_canvas.http_cache import CacheEntry, CachingAdapter, DiskCache
+
+URL = "https://canvas.example.com/api/v1/courses/34/users?page=1"
+
+
+class FakeServer:
+    def __init__(self):
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(dict(request.headers))
+        response = Response()
+        response.url = request.url
+        response.request = request
+        if request.headers.get("If-None-Match") == '"v1"':
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = '"v1"'
+            response.headers["Link"] = '<next>; rel="next"'
+            response._content = b'[{"id": 1}]'
+        return response
+
+
+def session_with_cache(tmp_path, monkeypatch, ttl):
+    server = FakeServer()
+    monkeypatch.setattr(HTTPAdapter, "send", server.send)
+    adapter = CachingAdapter(DiskCache(tmp_path), ttl)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session, adapter, server
+
+
+def test_fresh_entries_are_served_from_disk(tmp_path, monkeypatch):
+    session, adapter, server = session_with_cache(tmp_path, monkeypatch, ttl=60)
+    headers = {"Authorization": "Bearer token"}
+
+    first = session.get(URL, headers=headers)
+    second = session.get(URL, headers=headers)
+
+    assert len(server.requests) == 1
+    assert second.json() == first.json() == [{"id": 1}]
+    assert second.headers["Link"] == '<next>; rel="next"'
+    assert (adapter.stats.hits, adapter.stats.misses) == (1, 1)
+
+
+def test_stale_entries_are_revalidated(tmp_path, monkeypatch):
+    session, adapter, server = session_with_cache(tmp_path, monkeypatch, ttl=0)
+    headers = {"Authorization": "Bearer token"}
+
+    session.get(URL, headers=headers)
+    response = session.get(URL, headers=headers)
+
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1}]
+    assert adapter.stats.revalidated == 1
+
+
+def test_given_ttl_applies_to_all_endpoints(tmp_path, monkeypatch):
+    profile = "https://canvas.example.com/api/v1/users/7/profile"
+    adapter = CachingAdapter(DiskCache(tmp_path))
+    request = requests.Request("GET", profile).prepare()
+    assert adapter.endpoint_ttl(request) == 24 * 60 * 60
+    assert adapter.endpoint_ttl(requests.Request("GET", URL).prepare()) == 300
+
+    session, adapter, server = session_with_cache(tmp_path, monkeypatch, ttl=0)
+    session.get(profile)
+    session.get(profile)
+
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert adapter.stats.revalidated == 1
+
+
+def test_tokens_do_not_share_entries(tmp_path, monkeypatch):
+    session, adapter, server = session_with_cache(tmp_path, monkeypatch, ttl=60)
+
+    session.get(URL, headers={"Authorization": "Bearer one"})
+    session.get(URL, headers={"Authorization": "Bearer two"})
+
+    assert len(server.requests) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(tmp_path)
+    for mtime, key in enumerate(("a", "b", "c"), start=1):
+        cache.put(key, CacheEntry(200, {}, b"x" * 80))
+        os.utime(tmp_path / f"{key}.entry", (mtime, mtime))
+    cache.max_size = 3 * (tmp_path / "a.entry").stat().st_size + 16
+
+    cache.get("a")
+    cache.put("d", CacheEntry(200, {}, b"x" * 80))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.get("d") is not None
@@ -0,0 +1,66 @@
+import threading
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+
+from repobee_canvas.client import CancellableAdapter
+from repobee_canvas.jobs import Job
+
+
+class FakeTransport(HTTPAdapter):
+    def __init__(self, sent):
+        super(FakeTransport, self).__init__()
+        self.sent = sent
+
+    def send(self, request, **kwargs):
+        self.sent.append(request.url)
+        response = Response()
+        response.status_code = 200
+        return response
+
+
+class Adapter(CancellableAdapter, FakeTransport):
+    pass
+
+
+def test_cancelled_job_sends_no_more_requests():
+    sent = []
+    session = Session()
+    session.mount("https://", Adapter(sent))
+    paused, resumed, done = threading.Event(), threading.Event(), threading.Event()
+
+    def crawl():
+        for page in range(1, 100):
+            session.get(f"https://canvas.example.com/api/v1/courses?page={page}")
+            if page == 3:
+                paused.set()
+                resumed.wait()
+
+    job = Job("crawl", crawl, lambda job: done.set())
+    job.start()
+    assert paused.wait(5)
+    job.cancel()
+    resumed.set()
+    assert done.wait(5)
+
+    assert job.cancelled and job.error is None
+    assert len(sent) == 3
+
+    # Without a running job, requests are sent again.
+    session.get("https://canvas.example.com/api/v1/courses?page=4")
+    assert len(sent) == 4
+
+
+def test_job_reports_result_and_error():
+    ended = []
+    jobs = [
+        Job("verify", lambda: "Course", ended.append),
+        Job("execute", lambda: 1 / 0, ended.append),
+    ]
+    for job in jobs:
+        job.start()
+        job._thread.join(5)
+
+    assert ended == jobs
+    assert jobs[0].result == "Course" and not jobs[0].cancelled
+    assert isinstance(jobs[1].error, ZeroDivisionError)
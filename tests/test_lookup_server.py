@@ -0,0 +1,69 @@
+import json
+import threading
+from http.client import HTTPConnection
+from types import SimpleNamespace
+
+from repobee_canvas.columns import EMAIL, GROUP, ID
+from repobee_canvas.lookup_server import RosterSource, make_server
+from repobee_canvas.records import Row
+from repobee_canvas.writers import CsvWriter, write_rows
+
+
+def write_roster(path, groups):
+    write_rows(
+        (
+            Row(
+                SimpleNamespace(name=group) if group else "",
+                f"student{i}",
+                f"Student {i}",
+                i,
+                1000 + i,
+                f"s.student{i}@student.tue.nl",
+            )
+            for i, group in enumerate(groups, 1)
+        ),
+        [CsvWriter(path)],
+    )
+
+
+def get(server, path):
+    connection = HTTPConnection(*server.server_address)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_lookups_and_reload(tmp_path):
+    path = tmp_path / "student-info.csv"
+    write_roster(path, ["101", "101", "102", ""])
+    server = make_server(RosterSource(path, check_interval=0), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        status, students = get(
+            server, "/students?git_id=1003&email=S.Student1@student.tue.nl&git_id=9"
+        )
+        assert status == 200
+        assert [s and s[ID] for s in students] == [3, 1, None]
+
+        assert [s[EMAIL] for s in get(server, "/groups/101")[1]] == [
+            "s.student1@student.tue.nl",
+            "s.student2@student.tue.nl",
+        ]
+        assert list(get(server, "/teams")[1]) == ["101", "102"]
+        assert get(server, "/students")[0] == 400
+        # The CSV file has no Canvas IDs to look up.
+        assert get(server, "/students?canvas_id=1")[0] == 400
+
+        status, students = get(server, "/students?login_id=2&login_id=7")
+        assert status == 200
+        assert [s and s[EMAIL] for s in students] == [
+            "s.student2@student.tue.nl",
+            None,
+        ]
+
+        write_roster(path, ["101", "102", "102", "102"])
+        assert get(server, "/students?login_id=4")[1][0][GROUP] == "102"
+        assert get(server, "/health")[1]["students"] == 4
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,45 @@
+import io
+import time
+
+from repobee_canvas.progress import PROFILES, USERS, ProgressLine, ProgressStream
+
+
+def test_stream_keeps_latest_event_of_each_phase():
+    now = [0.0]
+    stream = ProgressStream(clock=lambda: now[0])
+
+    stream.report(PROFILES, 0, 100)
+    for done in range(1, 41):
+        now[0] = done * 0.05
+        stream.report(PROFILES, done, 100)
+        stream.report(USERS, done * 10)
+
+    events = stream.drain()
+    assert [event.phase for event in events] == [PROFILES, USERS]
+    profiles = events[0]
+    assert (profiles.done, profiles.total, profiles.percent()) == (40, 100, 40)
+    assert round(profiles.rate) == 20 and round(profiles.eta) == 3
+    assert events[1].total is None and events[1].eta is None
+    assert stream.drain() == []
+
+    stream.report(PROFILES, 50, 100)
+    assert [event.done for event in stream.drain()] == [50]
+
+
+def test_progress_line_shows_messages_above_the_progress(capsys):
+    stream = ProgressStream(clock=lambda: 1.0)
+    output = io.StringIO()
+    line = ProgressLine(stream, output, interval=0.01)
+    line.start()
+    stream.report(PROFILES, 5, 10)
+    while "profiles" not in output.getvalue():
+        time.sleep(0.01)
+
+    line.message("Created students info CSV file")
+    line.stop()
+
+    assert capsys.readouterr().out == "Created students info CSV file\n"
+    cleared = "\r" + " " * len("profiles 5/10 0/s") + "\r"
+    assert output.getvalue() == (
+        "\rprofiles 5/10 0/s" + cleared + "\rprofiles 5/10 0/s" + cleared
+    )
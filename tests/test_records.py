@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from repobee_canvas.columns import COLUMNS, EMAIL, GROUP, ID, NAME
+from repobee_canvas.records import Row, group_ref, printable
+
+
+def test_row_is_accessed_like_a_dict():
+    group = group_ref(SimpleNamespace(id=7, name=101, members_count=2))
+    row = Row(group, "student1", "Student 1", 1, 1001, "s.student1@tue.nl", 3)
+
+    assert list(row.keys()) == COLUMNS
+    assert row[GROUP].name == "101"
+    assert row[GROUP].max_membership is None
+    assert row[EMAIL] == "s.student1@tue.nl"
+    assert row.get("canvas_id") is None
+
+    copy = row.copy()
+    copy[GROUP] = row[GROUP].name
+    row[ID] = "s1"
+    assert copy[NAME] == "student1" and copy[ID] == 1 and row[ID] == "s1"
+    assert row.user_id == 3
+
+
+def test_group_names_are_interned():
+    first = group_ref(SimpleNamespace(id=7, name="".join(["10", "1"]), members_count=2))
+    second = group_ref(SimpleNamespace(id=7, name="".join(["1", "01"]), members_count=2))
+
+    assert first.name is second.name
+    assert first == second and hash(first) == hash(second)
+
+
+def test_printable_values_are_cached_until_a_column_is_set():
+    group = group_ref(SimpleNamespace(id=7, name="101", members_count=2))
+    row = Row(group, "student1", "Student 1", 1, 1001, "s.student1@tue.nl")
+
+    values = printable(row)
+    assert values == ("101", "student1", "Student 1", 1, 1001, "s.student1@tue.nl")
+    assert printable(row) is values
+
+    row[GROUP] = ""
+    assert printable(row)[0] == ""
+    assert printable({GROUP: group, NAME: "student1"}) == ("101", "student1")
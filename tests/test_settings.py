@@ -0,0 +1,91 @@
+import gc
+import json
+import subprocess
+import sys
+import time
+import weakref
+from pathlib import Path
+
+from repobee_canvas import settings
+from repobee_canvas.settings import SettingsStore, read_file, read_settings
+
+
+def test_cli_does_not_import_gui():
+    imported = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, canvas_info_cli; print(' '.join(sys.modules))",
+        ],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    assert "PySimpleGUI" not in imported
+    assert "tkinter" not in imported
+
+
+def test_read_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "settings_folder", lambda: tmp_path)
+    assert read_settings() == {}
+
+    (tmp_path / "canvas_info.json").write_text(
+        json.dumps({"canvas_course_id": "12345"}), "utf-8"
+    )
+    assert read_settings() == {"canvas_course_id": "12345"}
+
+    (tmp_path / "canvas_info.json").write_text("{", "utf-8")
+    assert read_settings() == {}
+
+
+def test_store_writes_a_burst_of_changes_once(tmp_path, monkeypatch):
+    path = tmp_path / "settings" / "canvas_info_gui.json"
+    writes = []
+    replace = settings.os.replace
+    monkeypatch.setattr(
+        settings.os, "replace", lambda *args: writes.append(replace(*args))
+    )
+    store = SettingsStore(path, flush_delay=0.05)
+
+    for percent in range(20, 90, 10):
+        store.set("col_percent", percent)
+    store.set("canvas_course_id", "12345")
+    store.delete("col_percent")
+    assert not path.exists()
+
+    time.sleep(0.3)
+    assert len(writes) == 1
+    assert read_file(path) == {"canvas_course_id": "12345"}
+    assert list(path.parent.iterdir()) == [path]
+
+    store.set("canvas_course_id", "54321")
+    store.flush()
+    assert len(writes) == 2
+    assert SettingsStore(path)["canvas_course_id"] == "54321"
+    assert SettingsStore(path)["col_percent"] is None
+
+
+def test_store_keeps_its_own_copy_of_values(tmp_path):
+    path = tmp_path / "canvas_info_gui.json"
+    store = SettingsStore(path, flush_delay=60)
+    courses = ["Course 1 - Unverified"]
+
+    store.set("courses", courses)
+    courses.append("Course 2 - Unverified")
+    store["courses"].append("Course 3 - Unverified")
+    store.flush()
+
+    assert store["courses"] == ["Course 1 - Unverified"]
+    assert read_file(path) == {"courses": ["Course 1 - Unverified"]}
+
+
+def test_unused_store_is_not_kept_until_exit(tmp_path):
+    store = SettingsStore(tmp_path / "canvas_info_gui.json")
+    stores = weakref.WeakSet([store])
+    assert store in settings._stores
+
+    del store
+    gc.collect()
+    assert len(stores) == 0
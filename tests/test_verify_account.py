@@ -1,5 +1,5 @@
 from repobee_canvas.command.verify_course_id import VerifyCourseByID
-from repobee_canvas.gui import KEY_ACCESS_TOKEN, KEY_BASE_URL, KEY_COURSE_ID
+from repobee_canvas.keys import KEY_ACCESS_TOKEN, KEY_BASE_URL, KEY_COURSE_ID
 import PySimpleGUI as sg
 
 
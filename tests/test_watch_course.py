@@ -0,0 +1,60 @@
+import json
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from repobee_canvas.client import _session, cache_stats
+from repobee_canvas.command.watch_course import watch_client
+
+BASE_URL = "https://canvas.example.com"
+COURSE = BASE_URL + "/api/v1/courses/34"
+
+
+class FakeCanvas:
+    """Answers the listings of a course, with an ETag per version."""
+
+    def __init__(self, user_ids):
+        self.user_ids = user_ids
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request.path_url)
+        etag = f'"{len(self.user_ids)}"'
+        response = Response()
+        response.url = request.url
+        response.request = request
+        if request.headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = etag
+            response._content = json.dumps(
+                [{"id": i, "user_id": i} for i in self.user_ids]
+            ).encode("utf-8")
+        return response
+
+
+def test_watch_does_not_mix_an_old_users_listing_with_new_enrollments(
+    tmp_path, monkeypatch
+):
+    server = FakeCanvas([1])
+    monkeypatch.setattr(HTTPAdapter, "send", server.send)
+    canvas = watch_client(BASE_URL, "token", tmp_path / "cache")
+    session = _session(canvas)
+    session.get(COURSE + "/users")
+    # The cached users listing is a poll older than the enrollments listing.
+    cache = session.get_adapter("https://").cache
+    for path in cache.directory.glob("*.entry"):
+        entry = cache.get(path.stem)
+        entry.stored_at -= 60
+        cache.put(path.stem, entry)
+    server.user_ids = [1, 2]
+    session.get(COURSE + "/enrollments")
+
+    enrollments = session.get(COURSE + "/enrollments").json()
+    users = session.get(COURSE + "/users").json()
+
+    assert [e["user_id"] for e in enrollments] == [u["id"] for u in users] == [1, 2]
+    assert len(server.requests) == 4
+    assert cache_stats(canvas).revalidated == 1
@@ -0,0 +1,125 @@
+import json
+from types import SimpleNamespace
+
+from repobee_canvas.command.create_students_files import write_students_files
+from repobee_canvas.columns import EMAIL, FULL_NAME, GIT_ID, GROUP, ID, NAME
+from repobee_canvas.records import GroupRef
+from repobee_canvas.writers import (
+    CsvWriter,
+    ExcelWriter,
+    RosterDiffWriter,
+    RowWriter,
+    export_rows,
+    write_rows,
+)
+
+
+def row(user_id, group=""):
+    return {
+        GROUP: group,
+        NAME: f"student{user_id}",
+        FULL_NAME: f"Student {user_id}",
+        ID: str(user_id),
+        GIT_ID: str(1000 + user_id),
+        EMAIL: f"s.student{user_id}@student.tue.nl",
+    }
+
+
+def test_no_files_for_no_rows(tmp_path):
+    writers = [CsvWriter(tmp_path / "a.csv"), ExcelWriter(tmp_path / "a.xlsx")]
+
+    assert write_rows(iter([]), writers) == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_csv_file_appears_complete_after_the_last_row(tmp_path):
+    path = tmp_path / "a.csv"
+    group = SimpleNamespace(name="101")
+    writer = CsvWriter(path)
+
+    def rows():
+        yield row(1, group)
+        # The rows go to a temporary file until all of them are written.
+        assert not path.exists()
+        yield row(2)
+
+    assert write_rows(rows(), [writer]) == 2
+    assert path.read_text("utf-8-sig").splitlines() == [
+        "Group,Name,FullName,ID,GitID,Mail",
+        "101,student1,Student 1,1,1001,s.student1@student.tue.nl",
+        ",student2,Student 2,2,1002,s.student2@student.tue.nl",
+    ]
+
+
+class FailingWriter(RowWriter):
+    def write_row(self, row: dict):
+        if row[ID] == "2":
+            raise OSError("disk full")
+
+
+def test_export_collects_errors_per_writer(tmp_path):
+    writers = [
+        FailingWriter(tmp_path / "failing"),
+        CsvWriter(tmp_path / "a.csv"),
+        ExcelWriter(tmp_path / "a.xlsx"),
+    ]
+
+    failing, csv_result, excel_result = export_rows(
+        (row(i) for i in range(1, 2001)), writers
+    )
+
+    assert isinstance(failing.error, OSError) and failing.count == 1
+    assert csv_result.error is None and csv_result.count == 2000
+    assert excel_result.error is None and excel_result.count == 2000
+    assert len((tmp_path / "a.csv").read_text("utf-8-sig").splitlines()) == 2001
+    assert excel_result.size() > 0
+
+
+def test_unchanged_files_are_not_replaced(tmp_path):
+    paths = [tmp_path / "a.csv", tmp_path / "a.xlsx"]
+    write_rows(iter([row(1), row(2)]), [CsvWriter(paths[0]), ExcelWriter(paths[1])])
+    inodes = [path.stat().st_ino for path in paths]
+
+    writers = [CsvWriter(paths[0]), ExcelWriter(paths[1])]
+    write_rows(iter([row(1), row(2)]), writers)
+    assert [writer.changed for writer in writers] == [False, False]
+    assert [path.stat().st_ino for path in paths] == inodes
+
+    writers = [CsvWriter(paths[0]), ExcelWriter(paths[1])]
+    write_rows(iter([row(1), row(3)]), writers)
+    assert [writer.changed for writer in writers] == [True, True]
+    assert sorted(tmp_path.iterdir()) == paths
+
+
+def test_roster_diff(tmp_path):
+    group = SimpleNamespace(name="101")
+    previous = [row(1, group), row(2, group), row(3)]
+    path = tmp_path / "diff.json"
+
+    write_rows(
+        iter([row(1, group), row(2), row(4)]), [RosterDiffWriter(path, previous)]
+    )
+
+    diff = json.loads(path.read_text("utf-8"))
+    assert [student[ID] for student in diff["added"]] == ["4"]
+    assert [student[ID] for student in diff["removed"]] == ["3"]
+    assert [(move["student"][ID], move["from"], move["to"]) for move in diff["moved"]] == [
+        ("2", "101", "")
+    ]
+
+
+def test_invalid_member_option_keeps_yaml_file(tmp_path):
+    yaml = tmp_path / "students.yaml"
+    yaml.write_text("101:\n\tmembers:[s.student1@student.tue.nl]\n")
+    group = GroupRef(101, "101", 1, 1)
+
+    assert not write_students_files(
+        iter([row(1, group)]), str(tmp_path / "a.csv"), None, str(yaml), None, ["email"]
+    )
+
+    assert yaml.read_text() == "101:\n\tmembers:[s.student1@student.tue.nl]\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "a.csv",
+        "students.yaml",
+    ]
+    assert write_students_files(iter([row(1, group)]), str(tmp_path / "b.csv"))